@@ -0,0 +1,112 @@
+"""
+Compares the hashing of large NIfTI files read into a buffer and memory mapped.
+
+The files are written once and then hashed `--repeat` times with each path, the best time being
+kept, so they are usually hashed from the page cache: this measures the cost of copying the data,
+not the speed of the disk. Drop the caches between the runs (e.g. `echo 3 > /proc/sys/vm/drop_caches`
+as root) to measure cold reads.
+
+Example:
+    python -m benchmarks.hashing --sizes 1,2,4 --output results.json
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import tempfile
+import time
+
+from bids2openminds.utility import HASH_BUFFER_SIZE, file_digest
+
+# Size of the blocks of random data the files are made of
+BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def write_nifti(path: str, size: int, seed: int = 0):
+    """Writes an uncompressed NIfTI-1 file of `size` bytes, with pseudo random voxel data."""
+    header = bytearray(352)
+    header[0:4] = struct.pack("<i", 348)
+    header[344:348] = b"n+1\0"
+    block = random.Random(seed).randbytes(BLOCK_SIZE)
+    with open(path, "wb") as file:
+        file.write(header)
+        written = len(header)
+        while written < size:
+            written += file.write(block[:size - written])
+
+
+def time_hashing(path: str, algorithm: str, mmap_threshold, repeat: int):
+    """Returns the best time in seconds of `repeat` hashes of the file."""
+    best_time = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        file_digest(path, algorithm, HASH_BUFFER_SIZE, mmap_threshold=mmap_threshold)
+        duration = time.perf_counter() - start
+        best_time = duration if best_time is None else min(best_time, duration)
+    return best_time
+
+
+def run_benchmark(sizes, algorithms=("MD5",), repeat=3, directory=None):
+    """
+    Times the hashing of a NIfTI file of each size in GiB with each algorithm, read into a buffer
+    ("stream") and memory mapped ("mmap").
+
+    Returns:
+    - list: A dictionary per file size and algorithm, with the time and throughput of each path.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=directory) as temporary_directory:
+        for size in sizes:
+            path = os.path.join(temporary_directory, "sub-01_T1w.nii")
+            number_bytes = int(size * 1024 ** 3)
+            write_nifti(path, number_bytes)
+            for algorithm in algorithms:
+                # The first hash fills the page cache, so that both paths read the same cached data
+                file_digest(path, algorithm, mmap_threshold=None)
+                result = {"size": number_bytes, "algorithm": algorithm}
+                for name, mmap_threshold in [("stream", None), ("mmap", 0)]:
+                    duration = time_hashing(path, algorithm, mmap_threshold, repeat)
+                    result[name] = {"time": duration, "throughput": number_bytes / duration}
+                results.append(result)
+            os.remove(path)
+    return results
+
+
+def format_results(results):
+    """Formats the results of `run_benchmark` as a table."""
+    rows = [["size", "algorithm", "stream", "mmap", "speedup"]]
+    for result in results:
+        rows.append([f"{result['size'] / 1024 ** 3:.1f} GiB", result["algorithm"]]
+                    + [f"{result[name]['time']:.3f}s ({result[name]['throughput'] / 1024 ** 2:.0f} MiB/s)"
+                       for name in ["stream", "mmap"]]
+                    + [f"{result['stream']['time'] / result['mmap']['time']:.2f}x"])
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares the hashing of large NIfTI files read into a buffer and memory mapped.")
+    parser.add_argument("--sizes", default="1,2,4",
+                        help="Comma separated sizes of the files in GiB.")
+    parser.add_argument("--algorithms", default="MD5",
+                        help="Comma separated hashing algorithms, as accepted by hashlib.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of hashes of each file with each path, the best time is kept.")
+    parser.add_argument("--directory", default=None,
+                        help="Directory in which the files are written, on the disk to benchmark.")
+    parser.add_argument("--output", default=None,
+                        help="JSON file in which the results are written.")
+    args = parser.parse_args()
+
+    results = run_benchmark([float(size) for size in args.sizes.split(",")], args.algorithms.split(","),
+                            args.repeat, args.directory)
+    print(format_results(results))
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Times each stage of `converter.convert` on synthetic datasets of increasing size and reports
+whether the time of each stage grows linearly with the number of files.
+
+Example:
+    python -m benchmarks.stages --subjects 10,20,40,80 --sessions 2 --runs 2 --output results.json
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from openminds import Collection
+
+import bids2openminds.converter
+import bids2openminds.main
+from bids2openminds.streaming import StreamingCollection
+from .synthetic import DATATYPE_FILES, generate_dataset
+
+# The timed stages, with the functions measured for each of them
+STAGES = {
+    "layout": [(bids2openminds.converter, "load_layout")],
+    "create_subjects": [(bids2openminds.main, "create_subjects")],
+    "create_file_bundle": [(bids2openminds.main, "create_file_bundle")],
+    "create_file": [(bids2openminds.main, "create_file")],
+    "validate": [(Collection, "validate"), (StreamingCollection, "validate")],
+    "save": [(Collection, "save"), (StreamingCollection, "save")],
+}
+
+# Stages whose functions call the functions of another stage, whose time is subtracted
+NESTED_STAGES = {"create_file": "create_file_bundle"}
+
+# Stages taking less than this many seconds at the largest scale are too fast to estimate their growth
+MINIMUM_TIME = 0.01
+
+
+@contextlib.contextmanager
+def timed_stages(times):
+    """
+    Adds the time spent in each stage to `times` while the context is active. Recursive and
+    nested calls of the functions of a stage are only counted once.
+    """
+    depths = defaultdict(int)
+    originals = []
+
+    def timed(stage, function):
+        def wrapper(*args, **kwargs):
+            depths[stage] += 1
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                depths[stage] -= 1
+                if depths[stage] == 0:
+                    times[stage] += time.perf_counter() - start
+        return wrapper
+
+    for stage, targets in STAGES.items():
+        for owner, name in targets:
+            original = owner.__dict__[name]
+            originals.append((owner, name, original))
+            setattr(owner, name, timed(stage, original))
+    try:
+        yield times
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+
+def run_conversion(input_path, output_path, **options):
+    """Converts a dataset and returns the time spent in each stage and in total, in seconds."""
+    times = defaultdict(float)
+    with timed_stages(times), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        bids2openminds.converter.convert(input_path, save_output=True, output_path=output_path,
+                                         quiet=True, **options)
+        times["total"] = time.perf_counter() - start
+    for stage, nested_stage in NESTED_STAGES.items():
+        times[stage] -= times[nested_stage]
+    return dict(times)
+
+
+def growth_exponent(sizes, times):
+    """
+    Returns the slope of the least squares fit of log(time) against log(size): about 1 for a stage
+    scaling linearly, about 2 for a quadratic one.
+    """
+    points = [(math.log(size), math.log(duration))
+              for size, duration in zip(sizes, times) if duration > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def run_benchmark(subjects, sessions=1, runs=1, datatypes=("anat", "func"), file_size=1024, repeat=3,
+                  tolerance=0.2, **options):
+    """
+    Times the stages of the conversion of synthetic datasets with each number of `subjects`.
+    The best time of `repeat` conversions is kept for each stage.
+
+    Returns:
+    - dict: The "scales" (number of subjects and files, and time of each stage) and, for each stage,
+      its growth exponent and whether it is "linear", "superlinear" or too fast to tell ("unknown").
+    """
+    # The lazy imports and lookups of the first conversion would be counted in the smallest scale
+    with tempfile.TemporaryDirectory() as directory:
+        generate_dataset(os.path.join(directory, "dataset"), 1, sessions, runs, datatypes, file_size)
+        run_conversion(os.path.join(directory, "dataset"), os.path.join(directory, "openminds.jsonld"), **options)
+
+    scales = []
+    for number_subjects in subjects:
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "dataset")
+            number_files = generate_dataset(input_path, number_subjects, sessions, runs, datatypes, file_size)
+            best_times = {}
+            for _ in range(repeat):
+                times = run_conversion(input_path, os.path.join(directory, "openminds.jsonld"), **options)
+                for stage, duration in times.items():
+                    best_times[stage] = min(duration, best_times.get(stage, duration))
+        scales.append({"subjects": number_subjects,
+                      "files": number_files, "times": best_times})
+
+    sizes = [scale["files"] for scale in scales]
+    stages = {}
+    for stage in [*STAGES, "total"]:
+        times = [scale["times"].get(stage, 0.0) for scale in scales]
+        exponent = growth_exponent(sizes, times)
+        if exponent is None or max(times) < MINIMUM_TIME:
+            scaling = "unknown"
+        elif exponent <= 1 + tolerance:
+            scaling = "linear"
+        else:
+            scaling = "superlinear"
+        stages[stage] = {"exponent": exponent, "scaling": scaling}
+    return {"scales": scales, "stages": stages}
+
+
+def format_results(results):
+    """Formats the results of `run_benchmark` as a table."""
+    scales = results["scales"]
+    header = ["stage"] + [f"{scale['files']} files" for scale in scales] + ["exponent", "scaling"]
+    rows = [header]
+    for stage, growth in results["stages"].items():
+        exponent = "-" if growth["exponent"] is None else f"{growth['exponent']:.2f}"
+        rows.append([stage] + [f"{scale['times'].get(stage, 0.0):.3f}s" for scale in scales]
+                    + [exponent, growth["scaling"]])
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times each stage of the conversion of synthetic datasets of increasing size.")
+    parser.add_argument("--subjects", default="10,20,40,80",
+                        help="Comma separated numbers of subjects of the datasets.")
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--datatypes", default="anat,func",
+                        help=f"Comma separated datatypes among {', '.join(DATATYPE_FILES)}.")
+    parser.add_argument("--file-size", type=int, default=1024,
+                        help="Approximate size in bytes of the data files.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of conversions of each dataset, the best time is kept.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Stages whose growth exponent exceeds 1 by more than this are reported as superlinear.")
+    parser.add_argument("--backend", default="pybids", choices=["pybids", "fast"])
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--output", default=None,
+                        help="JSON file in which the results are written.")
+    args = parser.parse_args()
+
+    results = run_benchmark([int(number) for number in args.subjects.split(",")], args.sessions, args.runs,
+                            args.datatypes.split(","), args.file_size, args.repeat, args.tolerance,
+                            backend=args.backend, jobs=args.jobs, stream=args.stream)
+    print(format_results(results))
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Generates synthetic BIDS datasets of any size, for benchmarking the conversion.
+
+Example:
+    python -m benchmarks.synthetic /tmp/synthetic --subjects 100 --sessions 2 --runs 3 --datatypes anat,func,eeg
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import struct
+
+# The files of each datatype, per session: (suffix, extensions, has a task and runs)
+DATATYPE_FILES = {
+    "anat": [("T1w", [".nii.gz"], False)],
+    "func": [("bold", [".nii.gz"], True), ("events", [".tsv"], True)],
+    "dwi": [("dwi", [".nii.gz", ".bval", ".bvec"], False)],
+    "eeg": [("eeg", [".edf", ".json"], True), ("channels", [".tsv"], True)],
+    "beh": [("beh", [".tsv"], True)],
+}
+
+# Extensions of the files filled with `file_size` bytes of data, the others are small text files
+DATA_EXTENSIONS = (".nii.gz", ".edf")
+
+
+def nifti_content(file_size: int, seed: int = 0):
+    """Returns a gzip compressed NIfTI-1 file of about `file_size` bytes, with random voxel data."""
+    header = bytearray(348)
+    header[0:4] = struct.pack("<i", 348)
+    header[344:348] = b"n+1\0"
+    data = random.Random(seed).randbytes(max(file_size - len(header), 0))
+    return gzip.compress(bytes(header) + data, compresslevel=1)
+
+
+def text_content(suffix: str, extension: str):
+    if extension == ".json":
+        return json.dumps({"TaskName": "rest"}).encode()
+    if suffix == "events":
+        return b"onset\tduration\ttrial_type\n0.0\t1.0\tgo\n2.0\t1.0\tstop\n"
+    if suffix == "channels":
+        return b"name\ttype\tunits\nCz\tEEG\tuV\n"
+    return b"onset\tresponse\n0.0\t1\n"
+
+
+def generate_dataset(root: str, subjects: int = 10, sessions: int = 1, runs: int = 1,
+                     datatypes=("anat", "func"), file_size: int = 1024, seed: int = 0):
+    """
+    Writes a synthetic BIDS dataset.
+
+    Parameters:
+    - root (str): The directory of the dataset, created if it does not exist.
+    - subjects (int, optional): The number of subjects. Default is 10.
+    - sessions (int, optional): The number of sessions per subject, without session directories if 1. Default is 1.
+    - runs (int, optional): The number of runs of the task of each functional datatype. Default is 1.
+    - datatypes (iterable, optional): The datatypes of each session, among DATATYPE_FILES. Default is ("anat", "func").
+    - file_size (int, optional): The approximate size in bytes of the data files (NIfTI and EDF). Default is 1024.
+    - seed (int, optional): The seed of the random data. Default is 0.
+
+    Returns:
+    - int: The number of files written.
+    """
+    unknown_datatypes = set(datatypes) - DATATYPE_FILES.keys()
+    if unknown_datatypes:
+        raise ValueError(
+            f"The datatypes must be among {', '.join(DATATYPE_FILES)}, you have specified {', '.join(sorted(unknown_datatypes))}.")
+
+    # The random data is generated and compressed once and shared by all the files
+    contents = {".nii.gz": nifti_content(file_size, seed),
+                ".edf": random.Random(seed).randbytes(file_size)}
+    number_files = 0
+
+    def write(path, content):
+        nonlocal number_files
+        path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(content)
+        number_files += 1
+
+    write("dataset_description.json", json.dumps(
+        {"Name": "Synthetic dataset", "BIDSVersion": "1.8.0", "Authors": ["Jane Doe", "John Smith"]}).encode())
+    write("participants.json", json.dumps(
+        {"age": {"Description": "age of the participant", "Units": "year"}}).encode())
+    rows = ["participant_id\tage\tsex\thandedness"]
+    rows += [f"sub-{subject:04d}\t{20 + subject % 50}\t{'MF'[subject % 2]}\t{'RL'[subject % 5 == 0]}"
+             for subject in range(1, subjects + 1)]
+    write("participants.tsv", ("\n".join(rows) + "\n").encode())
+
+    for subject in range(1, subjects + 1):
+        for session in range(1, sessions + 1):
+            directory = f"sub-{subject:04d}"
+            prefix = f"sub-{subject:04d}"
+            if sessions > 1:
+                directory = os.path.join(directory, f"ses-{session:02d}")
+                prefix += f"_ses-{session:02d}"
+            for datatype in datatypes:
+                for suffix, extensions, has_runs in DATATYPE_FILES[datatype]:
+                    names = [f"{prefix}_task-rest_run-{run}_{suffix}" for run in range(1, runs + 1)] \
+                        if has_runs else [f"{prefix}_{suffix}"]
+                    for name in names:
+                        for extension in extensions:
+                            content = contents.get(
+                                extension) or text_content(suffix, extension)
+                            write(os.path.join(directory, datatype,
+                                  name + extension), content)
+    return number_files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generates a synthetic BIDS dataset.")
+    parser.add_argument("root", help="The directory of the dataset.")
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--datatypes", default="anat,func",
+                        help=f"Comma separated datatypes among {', '.join(DATATYPE_FILES)}.")
+    parser.add_argument("--file-size", type=int, default=1024,
+                        help="Approximate size in bytes of the data files.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    number_files = generate_dataset(args.root, args.subjects, args.sessions, args.runs,
+                                    args.datatypes.split(","), args.file_size, args.seed)
+    print(f"Wrote {number_files} files in {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import re
+import stat
+from collections import namedtuple
+
+# The git-annex backends whose keys contain the digest of the content, with the name of their
+# algorithm as recorded in the Hash nodes (see `hashing.algorithm_name`)
+ANNEX_ALGORITHMS = {
+    "MD5": "MD5",
+    "SHA1": "SHA1",
+    "SHA224": "SHA224",
+    "SHA256": "SHA256",
+    "SHA384": "SHA384",
+    "SHA512": "SHA512",
+    "SHA3_224": "SHA3_224",
+    "SHA3_256": "SHA3_256",
+    "SHA3_384": "SHA3_384",
+    "SHA3_512": "SHA3_512",
+    "BLAKE2B512": "BLAKE2B",
+    "BLAKE2S256": "BLAKE2S",
+}
+
+# BACKEND-sSIZE[-mMTIME][-Sx-Cy]--NAME, the size is missing from some keys, e.g. of URL backends
+ANNEX_KEY_PATTERN = re.compile(r"(?P<backend>[A-Z0-9_]+)(?:-s(?P<size>\d+))?(?:-[mSC]\d+)*--(?P<name>.+)")
+HEX_PATTERN = re.compile(r"[0-9a-f]+")
+
+
+class AnnexKey(namedtuple("AnnexKey", ["backend", "size", "algorithm", "digest"])):
+    """
+    A git-annex key: its backend, the size of the content in bytes (None if unknown), and the
+    algorithm and hexadecimal digest of the content for the hashing backends (else None).
+    """
+
+    def digest_of(self, algorithm: str):
+        """Returns the digest of the content for the given algorithm, or None if the key doesn't contain it."""
+        return self.digest if algorithm == self.algorithm else None
+
+
+def parse_annex_key(key: str):
+    """
+    Parses a git-annex key, e.g. "MD5E-s12345--0123456789abcdef0123456789abcdef.nii.gz".
+
+    Returns:
+    - AnnexKey: The parsed key, or None if it isn't a git-annex key.
+    """
+    match = ANNEX_KEY_PATTERN.fullmatch(key)
+    if match is None:
+        return None
+    backend, name = match.group("backend"), match.group("name")
+    size = int(match.group("size")) if match.group("size") is not None else None
+
+    # The backends ending with E keep the extension of the file after the digest
+    algorithm = ANNEX_ALGORITHMS.get(backend)
+    if algorithm is None and backend.endswith("E"):
+        algorithm = ANNEX_ALGORITHMS.get(backend[:-1])
+        name = name.split(".", 1)[0]
+    if algorithm is None or not HEX_PATTERN.fullmatch(name):
+        return AnnexKey(backend, size, None, None)
+    return AnnexKey(backend, size, algorithm, name)
+
+
+def annex_key(path: str):
+    """
+    Returns the git-annex key of an annexed file, a symbolic link to the object storing its
+    content in .git/annex/objects, whether the content is present or not. Returns None for
+    the other files.
+    """
+    try:
+        target = os.readlink(path)
+    except (OSError, ValueError):
+        return None
+    target = target.replace("\\", "/")
+    if "/annex/objects/" not in target:
+        return None
+    return parse_annex_key(target.rsplit("/", 1)[-1])
+
+
+def content_present(file_stat: os.stat_result):
+    """Whether the content of a file is present, its stat being the one of its symbolic link otherwise."""
+    return not stat.S_ISLNK(file_stat.st_mode)
+
+
+def content_size(file_stat: os.stat_result, key=None):
+    """The size of the content of a file, taken from its AnnexKey if the content isn't present."""
+    if key is not None and key.size is not None and not content_present(file_stat):
+        return key.size
+    return file_stat.st_size
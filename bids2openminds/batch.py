@@ -0,0 +1,152 @@
+import contextlib
+import importlib
+import io
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from .converter import convert
+
+# The types of nodes counted in the summary of each conversion, with the name of their count
+COUNTED_TYPES = {"Subject": "subjects", "SubjectState": "subject_states", "File": "files",
+                 "FileBundle": "file_bundles", "BehavioralProtocol": "behavioral_protocols"}
+
+
+def find_datasets(root_or_list: str):
+    """
+    Lists the BIDS datasets to convert.
+
+    Parameters:
+    - root_or_list (str): Either a dataset, a directory whose subdirectories containing a
+      dataset_description.json are datasets, or a text file listing one dataset path per line,
+      relative paths being relative to the directory of the file. Empty lines and lines starting
+      with "#" are ignored.
+
+    Returns:
+    - list: The paths of the datasets.
+    """
+    if os.path.isfile(root_or_list):
+        with open(root_or_list, "r") as file:
+            lines = [line.strip() for line in file]
+        # The list can be moved along with the datasets
+        list_directory = os.path.dirname(root_or_list)
+        return [os.path.join(list_directory, line) for line in lines if line and not line.startswith("#")]
+
+    if os.path.isfile(os.path.join(root_or_list, "dataset_description.json")):
+        return [root_or_list]
+
+    return sorted(entry.path for entry in os.scandir(root_or_list)
+                  if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "dataset_description.json")))
+
+
+def batch_output_path(input_path: str, output_dir: str = None, multiple_files: bool = False):
+    """Returns where the output of a dataset is written, None for the default location inside the dataset."""
+    if output_dir is None:
+        return None
+    name = os.path.basename(os.path.normpath(input_path))
+    if multiple_files:
+        return os.path.join(output_dir, name)
+    return os.path.join(output_dir, f"{name}.jsonld")
+
+
+def count_nodes(collection):
+    """Counts the nodes of the types of COUNTED_TYPES in a collection, including the nodes already streamed."""
+    counts = dict.fromkeys(COUNTED_TYPES.values(), 0)
+    type_counts = dict(getattr(collection, "streamed", {}))
+    for node in collection:
+        type_counts[node.type_] = type_counts.get(node.type_, 0) + 1
+    for type_, count in type_counts.items():
+        name = COUNTED_TYPES.get(type_.rsplit("/", 1)[-1])
+        if name is not None:
+            counts[name] += count
+    return counts
+
+
+def convert_dataset(input_path: str, output_path: str = None, **options):
+    """
+    Converts a dataset, isolating its failure from the other datasets of a batch.
+
+    Parameters:
+    - input_path (str): The path to the BIDS directory.
+    - output_path (str, optional): The output path, see `converter.convert`.
+    - options: The other arguments of `converter.convert`.
+
+    Returns:
+    - dict: The summary of the conversion, with its "status" ("success" or "failed"), the "error"
+      if it failed, the "warnings" raised, the "counts" of converted nodes and its "duration" in seconds.
+    """
+    summary = {"input_path": input_path, "output_path": output_path,
+               "status": "success", "error": None, "warnings": [], "counts": None}
+    start = time.perf_counter()
+    # The report of each dataset is discarded and its warnings are recorded in the summary instead
+    with warnings.catch_warnings(record=True) as raised_warnings, contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter("always")
+        try:
+            collection = convert(input_path, save_output=True,
+                                 output_path=output_path, **options)
+            summary["counts"] = count_nodes(collection)
+        except Exception as error:
+            summary["status"] = "failed"
+            summary["error"] = f"{type(error).__name__}: {error}"
+    summary["warnings"] = list(dict.fromkeys(
+        str(warning.message) for warning in raised_warnings))
+    summary["duration"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def convert_datasets(input_paths, jobs: int = 1, output_dir: str = None, multiple_files: bool = False, **options):
+    """
+    Converts several datasets, in parallel using a pool of `jobs` processes.
+
+    Parameters:
+    - input_paths (list): The paths of the datasets.
+    - jobs (int, optional): The number of datasets converted in parallel, values below 1 use one
+      process per CPU. Default is 1, converting the datasets one after the other in this process.
+    - output_dir (str, optional): A directory in which the output of each dataset is written, named
+      after the dataset. By default, the output is written inside each dataset.
+    - multiple_files (bool, optional): Whether each node is saved into a separate file. Default is False.
+    - options: The other arguments of `converter.convert`.
+
+    Returns:
+    - dict: The summary of the batch, with the summary of each dataset (see `convert_dataset`) in
+      "datasets", the number of datasets that "succeeded" and "failed" and the total "duration" in seconds.
+    """
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+
+    output_paths = [batch_output_path(input_path, output_dir, multiple_files)
+                    for input_path in input_paths]
+    if output_dir is not None:
+        duplicates = {path for path in output_paths if output_paths.count(path) > 1}
+        if duplicates:
+            raise ValueError(
+                f"Several datasets have the same name and would be written to the same output: {', '.join(sorted(duplicates))}.")
+        os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    if jobs == 1 or len(input_paths) < 2:
+        datasets = [convert_dataset(input_path, output_path, multiple_files=multiple_files, **options)
+                    for input_path, output_path in zip(input_paths, output_paths)]
+    else:
+        # The conversion modules are imported before the workers are started, so that forked workers
+        # don't import them again
+        importlib.import_module(".main", __package__)
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(convert_dataset, input_path, output_path, multiple_files=multiple_files,
+                                       **options)
+                       for input_path, output_path in zip(input_paths, output_paths)]
+            datasets = []
+            for input_path, output_path, future in zip(input_paths, output_paths, futures):
+                try:
+                    datasets.append(future.result())
+                except Exception as error:
+                    # The worker process itself failed, e.g. it was killed
+                    datasets.append({"input_path": input_path, "output_path": output_path, "status": "failed",
+                                     "error": f"{type(error).__name__}: {error}", "warnings": [],
+                                     "counts": None, "duration": None})
+
+    succeeded = sum(dataset["status"] == "success" for dataset in datasets)
+    return {"datasets": datasets, "succeeded": succeeded, "failed": len(datasets) - succeeded,
+            "duration": round(time.perf_counter() - start, 3)}
@@ -1,14 +1,69 @@
+import json
 import warnings
-from bids import BIDSLayout, BIDSValidator
-from openminds import Collection
 import os
 import click
-from . import main
-from . import utility
-from . import report
+from .hash_cache import HashCache, DEFAULT_MAX_ENTRIES
+from .incremental import PreviousConversion
+from .layout import load_layout, BACKENDS
+from .hash_policy import parse_hash_policy
+from .hashing import OPTIONAL_ALGORITHMS, parse_hash_algorithms
+from .manifest import ChecksumManifest
 
 
-def convert(input_path,  save_output=False, output_path=None, multiple_files=False, include_empty_properties=False, quiet=False):
+class DefaultCommandGroup(click.Group):
+    """
+    A click group that runs its default command when the first argument is not the name
+    of one of its commands, so that `bids2openminds INPUT_PATH` keeps working next to
+    the other commands.
+    """
+
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands:
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+
+def validate_hash_policy(ctx, param, value):
+    try:
+        return parse_hash_policy(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
+def validate_hash_algorithms(ctx, param, value):
+    try:
+        return parse_hash_algorithms(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
+def optional_algorithms_help():
+    # The optional algorithms grouped by the package providing them, e.g. "xxh32 and xxh64 if the xxhash package is installed"
+    packages = {}
+    for algorithm, (module_name, _) in OPTIONAL_ALGORITHMS.items():
+        packages.setdefault(module_name, []).append(algorithm)
+    groups = []
+    for module_name, algorithms in packages.items():
+        names = algorithms[0] if len(algorithms) == 1 else f"{', '.join(algorithms[:-1])} and {algorithms[-1]}"
+        groups.append(f"{names} if the {module_name} package is installed")
+    return ", or ".join(groups)
+
+
+HASH_ALGORITHMS_HELP = ("Comma separated hash algorithms whose digests are recorded for each file, computed from a single "
+                        f"read: any algorithm of hashlib (e.g. sha256), {optional_algorithms_help()}.")
+
+
+def default_output_path(input_path, multiple_files=False):
+    if multiple_files:
+        return os.path.join(input_path, "openminds")
+    return os.path.join(input_path, "openminds.jsonld")
+
+
+def convert(input_path,  save_output=False, output_path=None, multiple_files=False, include_empty_properties=False, quiet=False, jobs=1, hash_cache=None, incremental=False, layout=None, layout_db=None, backend="pybids", stream=False, profile=False, progress=None, io_concurrency=None, hash_policy="full", hash_algorithms="MD5", checksum_manifest=None, verify_checksums=0):
     if not (os.path.isdir(input_path)):
         raise NotADirectoryError(
             f"The input directory is not valid, you have specified {input_path} which is not a directory."
@@ -17,13 +72,77 @@ def convert(input_path,  save_output=False, output_path=None, multiple_files=Fal
     # if not(BIDSValidator().is_bids(input_path)):
     #  raise NotADirectoryError(f"The input directory is not valid, you have specified {input_path} which is not a BIDS directory.")
 
+    # openminds, pandas and pybids take seconds to import, they are only loaded once a conversion starts
+    # so that the command line help and argument errors are immediate
+    from openminds import Collection
+    from . import main
+    from . import utility
+    from . import report
+    from .profiling import Profiler
+
+    from .progress import Progress, print_progress
+
+    profiler = Profiler()
+    # The progress of the scan and of the hashing is displayed, or reported to the given callback
+    if progress is True:
+        progress = Progress(print_progress)
+    elif progress:
+        progress = Progress(progress)
+    else:
+        progress = None
+
+    if stream and not save_output:
+        raise ValueError(
+            "The output can only be streamed when it is saved, set save_output=True.")
+    if jobs is not None and jobs < 0:
+        raise ValueError(
+            f"The number of jobs can't be negative, use 0 for one job per CPU, you have specified {jobs}.")
+    if io_concurrency is not None and io_concurrency < 1:
+        raise ValueError(
+            f"The I/O concurrency must be a positive number of files, you have specified {io_concurrency}.")
+    hash_policy = parse_hash_policy(hash_policy)
+    hash_algorithms = parse_hash_algorithms(hash_algorithms)
+    if hash_policy.mode == "fingerprint" and hash_algorithms != ("MD5",):
+        raise ValueError(
+            f"The fingerprints have their own algorithm, they can't be computed with {', '.join(hash_algorithms)}.")
+    if verify_checksums < 0:
+        raise ValueError(
+            f"The number of files whose checksums are verified can't be negative, you have specified {verify_checksums}.")
+    # The checksum manifests can be given as paths to the manifests or bags or as a loaded ChecksumManifest
+    if checksum_manifest is not None and not isinstance(checksum_manifest, ChecksumManifest):
+        checksum_manifest = ChecksumManifest(checksum_manifest)
+
     if quiet:
         warnings.filterwarnings('ignore')
 
-    collection = Collection()
-    bids_layout = BIDSLayout(input_path)
+    # In incremental mode the files that didn't change since the previous output are not hashed again
+    previous_conversion = None
+    if incremental:
+        previous_output_path = output_path or default_output_path(
+            input_path, multiple_files)
+        if os.path.exists(previous_output_path):
+            previous_conversion = PreviousConversion(previous_output_path)
+        else:
+            warnings.warn(
+                f"No previous output found at {previous_output_path}, the whole dataset will be converted.")
 
-    layout_df = bids_layout.to_df()
+    if save_output and output_path is None:
+        output_path = default_output_path(input_path, multiple_files)
+
+    # A streaming collection writes the files to the output as they are created instead of keeping them
+    if stream:
+        # The streaming collection relies on internals of openminds, it is only imported when used
+        from .streaming import StreamingCollection
+        collection = StreamingCollection(output_path, individual_files=multiple_files,
+                                         include_empty_properties=include_empty_properties)
+    else:
+        collection = Collection()
+    with profiler.stage("layout"):
+        bids_layout = load_layout(input_path, layout=layout,
+                                  layout_db=layout_db, backend=backend)
+
+        layout_df = bids_layout.to_df()
+        profiler.add(files=len(layout_df))
 
     subjects_id = bids_layout.get_subjects()
 
@@ -32,54 +151,156 @@ def convert(input_path,  save_output=False, output_path=None, multiple_files=Fal
 
     dataset_description = utility.read_json(dataset_description_path.iat[0, 0])
 
-    [subjects_dict, subject_state_dict, subjects_list] = main.create_subjects(
-        subjects_id, layout_df, bids_layout, collection)
+    with profiler.stage("create_subjects"):
+        [subjects_dict, subject_state_dict, subjects_list] = main.create_subjects(
+            subjects_id, layout_df, bids_layout, collection)
 
-    behavioral_protocols, behavioral_protocols_dict = main.create_behavioral_protocol(
-        bids_layout, collection)
+    with profiler.stage("create_behavioral_protocol"):
+        behavioral_protocols, behavioral_protocols_dict = main.create_behavioral_protocol(
+            bids_layout, collection)
 
-    [files_list, file_repository] = main.create_file(
-        layout_df, input_path, collection)
+    # The hash cache can be given as a path to the cache database or as an open HashCache
+    if hash_cache is None or isinstance(hash_cache, HashCache):
+        cache = hash_cache
+    else:
+        cache = HashCache(hash_cache)
+    try:
+        with profiler.stage("create_file"):
+            [files_list, file_repository] = main.create_file(
+                layout_df, input_path, collection, jobs=jobs, hash_cache=cache, previous_conversion=previous_conversion,
+                profiler=profiler, progress=progress, io_concurrency=io_concurrency, hash_policy=hash_policy,
+                hash_algorithms=hash_algorithms, checksum_manifest=checksum_manifest, verify_checksums=verify_checksums,
+                # The directories listed by the fast layout backend are not listed again
+                listings=getattr(bids_layout, "listings", None))
+            profiler.add(files=len(layout_df))
+    finally:
+        if cache is not hash_cache:
+            cache.close()
 
-    dataset_version = main.create_dataset_version(
-        bids_layout, dataset_description, layout_df, subjects_list, file_repository, behavioral_protocols, collection)
+    with profiler.stage("create_dataset"):
+        dataset_version = main.create_dataset_version(
+            bids_layout, dataset_description, layout_df, subjects_list, file_repository, behavioral_protocols, collection)
 
-    dataset = main.create_dataset(
-        dataset_description, dataset_version, collection)
+        dataset = main.create_dataset(
+            dataset_description, dataset_version, collection)
 
-    failures = collection.validate(ignore=["required", "value"])
+    with profiler.stage("validate"):
+        failures = collection.validate(ignore=["required", "value"])
     assert len(failures) == 0
 
     if save_output:
-        if output_path is None:
-            if multiple_files:
-                output_path = os.path.join(input_path, "openminds")
-            else:
-                output_path = os.path.join(input_path, "openminds.jsonld")
-
-        collection.save(output_path, individual_files=multiple_files,
-                        include_empty_properties=include_empty_properties)
+        with profiler.stage("save"):
+            collection.save(output_path, individual_files=multiple_files,
+                            include_empty_properties=include_empty_properties)
 
     if not quiet:
         print(report.create_report(dataset, dataset_version, collection,
-                                   dataset_description, input_path, output_path))
+                                   dataset_description, input_path, output_path, previous_conversion))
 
     else:
         print("Conversion was successful")
 
+    # The profile is attached to the collection, and also written if a path is given
+    if profile:
+        collection.profile = profiler.to_dict()
+        if not isinstance(profile, bool):
+            with open(profile, "w") as file:
+                json.dump(collection.profile, file, indent=2)
+
     return collection
 
 
-@click.command()
+@click.command(name="convert", epilog="Run 'bids2openminds batch --help' for converting many datasets in parallel and 'bids2openminds hash-cache --help' for managing hash caches.")
 @click.argument("input-path", type=click.Path(file_okay=False, exists=True))
 @click.option("-o", "--output-path", default=None, type=click.Path(file_okay=True, writable=True), help="The output path or filename for OpenMINDS file/files.")
 @click.option("--single-file", "multiple_files", flag_value=False, default=False, help="Save the entire collection into a single file (default).")
 @click.option("--multiple-files", "multiple_files", flag_value=True, help="Each node is saved into a separate file within the specified directory. 'output-path' if specified, must be a directory.")
 @click.option("-e", "--include-empty-properties", is_flag=True, default=False, help="Whether to include empty properties in the final file.")
 @click.option("-q", "--quiet", is_flag=True, default=False, help="Not generate the final report and no warning.")
-def convert_click(input_path, output_path, multiple_files, include_empty_properties, quiet):
+@click.option("-j", "--jobs", default=1, type=click.IntRange(min=0), metavar="N", show_default=True, help="Number of files hashed and probed in parallel. 0 uses one job per CPU.")
+@click.option("--hash-cache", default=None, type=click.Path(dir_okay=False), help="SQLite file caching the digests of unchanged files between runs, created if it does not exist.")
+@click.option("--incremental", is_flag=True, default=False, help="Reuse the hashes and formats of the files that didn't change since the previous output at 'output-path'.")
+@click.option("--layout-db", default=None, type=click.Path(file_okay=False), help="Directory in which the pybids index of the dataset is stored and reused until the dataset changes.")
+@click.option("--backend", default="pybids", type=click.Choice(BACKENDS), show_default=True, help="How the dataset is indexed: with pybids, or by parsing the entities from the file names (fast).")
+@click.option("--stream", is_flag=True, default=False, help="Write the files to the output as they are converted instead of keeping them in memory until the end.")
+@click.option("--profile", default=None, type=click.Path(dir_okay=False, writable=True), help="JSON file in which the time, CPU time, peak memory, files and bytes read of each stage of the conversion are written.")
+@click.option("--progress", is_flag=True, default=False, help="Display the progress of the scan and of the hashing of the files, with the throughput and the estimated time left.")
+@click.option("--io-concurrency", default=None, type=click.IntRange(min=1), metavar="N", help="Read up to N files at the same time with an asynchronous pipeline, for high-latency storage such as network file systems. Replaces --jobs for the reading of the files.")
+@click.option("--hash", "hash_algorithms", default="MD5", show_default=True, metavar="ALGO[,ALGO...]", callback=validate_hash_algorithms, help=HASH_ALGORITHMS_HELP)
+@click.option("--hash-policy", default="full", show_default=True, metavar="POLICY", callback=validate_hash_policy, help="Which files are hashed: all of them (full), none of them (none), those smaller than N bytes, e.g. max-size=1G (max-size=N), or all of them with a cheap non-standard digest of their size, start and end (fingerprint).")
+@click.option("--checksum-manifest", "checksum_manifests", multiple=True, type=click.Path(exists=True), metavar="PATH", help="Checksum manifest (e.g. MD5SUMS or manifest-sha256.txt) or BagIt bag whose recorded digests are used instead of hashing the files. Can be repeated.")
+@click.option("--verify-checksums", default=0, show_default=True, type=click.IntRange(min=0), metavar="N", help="Hash a random sample of N files listed in the checksum manifests and stop if their digests differ.")
+def convert_click(input_path, output_path, multiple_files, include_empty_properties, quiet, jobs, hash_cache, incremental, layout_db, backend, stream, profile, progress, io_concurrency, hash_algorithms, hash_policy, checksum_manifests, verify_checksums):
     convert(input_path, save_output=True, output_path=output_path,
-            multiple_files=multiple_files, include_empty_properties=include_empty_properties, quiet=quiet)
+            multiple_files=multiple_files, include_empty_properties=include_empty_properties, quiet=quiet, jobs=jobs,
+            hash_cache=hash_cache, incremental=incremental, layout_db=layout_db, backend=backend, stream=stream, profile=profile or False, progress=progress,
+            io_concurrency=io_concurrency, hash_policy=hash_policy, hash_algorithms=hash_algorithms,
+            checksum_manifest=list(checksum_manifests) or None, verify_checksums=verify_checksums)
+
+
+@click.command(name="batch")
+@click.argument("root-or-list", type=click.Path(exists=True))
+@click.option("-o", "--output-dir", default=None, type=click.Path(file_okay=False, writable=True), help="Directory in which the output of each dataset is written, named after the dataset. By default the output is written inside each dataset.")
+@click.option("--single-file", "multiple_files", flag_value=False, default=False, help="Save each dataset into a single file (default).")
+@click.option("--multiple-files", "multiple_files", flag_value=True, help="Save each node of a dataset into a separate file.")
+@click.option("-e", "--include-empty-properties", is_flag=True, default=False, help="Whether to include empty properties in the final files.")
+@click.option("-j", "--jobs", default=1, type=click.IntRange(min=0), metavar="N", show_default=True, help="Number of datasets converted in parallel. 0 uses one process per CPU.")
+@click.option("--incremental", is_flag=True, default=False, help="Reuse the hashes and formats of the files that didn't change since the previous output of each dataset.")
+@click.option("--backend", default="pybids", type=click.Choice(BACKENDS), show_default=True, help="How the datasets are indexed: with pybids, or by parsing the entities from the file names (fast).")
+@click.option("--stream", is_flag=True, default=False, help="Write the files to the output as they are converted instead of keeping them in memory until the end.")
+@click.option("--hash", "hash_algorithms", default="MD5", show_default=True, metavar="ALGO[,ALGO...]", callback=validate_hash_algorithms, help=HASH_ALGORITHMS_HELP)
+@click.option("--hash-policy", default="full", show_default=True, metavar="POLICY", callback=validate_hash_policy, help="Which files are hashed: all of them (full), none of them (none), those smaller than N bytes, e.g. max-size=1G (max-size=N), or all of them with a cheap non-standard digest of their size, start and end (fingerprint).")
+@click.option("--summary", "summary_path", default=None, type=click.Path(dir_okay=False, writable=True), help="JSON file in which the summary of the batch is written. By default it is printed.")
+def batch_click(root_or_list, output_dir, multiple_files, include_empty_properties, jobs, incremental, backend, stream, hash_algorithms, hash_policy, summary_path):
+    """
+    Convert many datasets: the subdirectories of ROOT_OR_LIST that are BIDS datasets, or the
+    datasets listed in the file ROOT_OR_LIST, one path per line relative to the file. The failure
+    of a dataset doesn't stop the others, the command exits with an error if any of them failed.
+    """
+    from .batch import find_datasets, convert_datasets
+
+    summary = convert_datasets(find_datasets(root_or_list), jobs=jobs, output_dir=output_dir,
+                               multiple_files=multiple_files, include_empty_properties=include_empty_properties,
+                               incremental=incremental, backend=backend, stream=stream, hash_policy=hash_policy,
+                               hash_algorithms=hash_algorithms)
+    if summary_path is None:
+        click.echo(json.dumps(summary, indent=2))
+    else:
+        with open(summary_path, "w") as file:
+            json.dump(summary, file, indent=2)
+        click.echo(
+            f"Converted {summary['succeeded']} datasets, {summary['failed']} failed, the summary is in {summary_path}.")
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+@click.group(name="hash-cache")
+def hash_cache_click():
+    """Manage the hash caches used by the --hash-cache option."""
+
+
+@hash_cache_click.command(name="prune")
+@click.argument("cache-path", type=click.Path(dir_okay=False, exists=True))
+@click.option("--max-entries", default=DEFAULT_MAX_ENTRIES, type=click.IntRange(min=1), show_default=True, help="Maximum number of digests kept, the least recently used ones are removed first.")
+def hash_cache_prune_click(cache_path, max_entries):
+    """Remove the digests of files that were deleted or changed since they were hashed."""
+    with HashCache(cache_path, max_entries=max_entries) as cache:
+        removed = cache.prune()
+        remaining = len(cache)
+    click.echo(f"Removed {removed} entries, {remaining} entries remaining.")
+
+
+@click.group(cls=DefaultCommandGroup, default_command="convert")
+def cli():
+    """
+    Generates openMINDS metadata from a BIDS dataset (convert, the default command), from many
+    datasets in parallel (batch), and manages the hash caches (hash-cache).
+    """
+
+
+cli.add_command(convert_click)
+cli.add_command(batch_click)
+cli.add_command(hash_cache_click)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+
+# Default maximum number of digests kept in a cache, the least recently used ones are evicted first
+DEFAULT_MAX_ENTRIES = 1000000
+
+
+class HashCache:
+    """
+    A persistent on-disk cache of file digests stored in a SQLite database.
+
+    A digest is stored for a given absolute path and algorithm, together with the size,
+    modification time (in nanoseconds) and inode of the file when it was hashed. A cached
+    digest is only returned if all of these still match the current state of the file.
+
+    Parameters:
+    - path (str): The path to the SQLite database, created if it does not exist.
+    - max_entries (int, optional): The maximum number of digests kept in the cache. When the
+      cache is closed, the least recently used digests beyond this number are removed.
+      Default is DEFAULT_MAX_ENTRIES.
+
+    Example:
+    >>> with HashCache("hashes.sqlite") as cache:
+    ...     digest = cache.get(file_path, os.stat(file_path), "MD5")
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError(
+                f"The hash cache must be able to hold at least one entry, you have specified {max_entries}.")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._used = {}
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT NOT NULL, algorithm TEXT NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, digest TEXT NOT NULL, "
+            "last_used INTEGER NOT NULL, PRIMARY KEY (path, algorithm))")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+        self._connection.commit()
+        # Logical clock ordering the uses of the digests, for least recently used eviction
+        self._clock = self._connection.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM hashes").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def get(self, file_path: str, file_stat: os.stat_result, algorithm: str = "MD5"):
+        """
+        Returns the cached digest of a file, or None if the file is not in the cache
+        or has changed since it was hashed.
+        """
+        key = (os.path.abspath(file_path), algorithm)
+        row = self._connection.execute(
+            "SELECT size, mtime_ns, inode, digest FROM hashes WHERE path = ? AND algorithm = ?", key).fetchone()
+        if row is None or tuple(row[:3]) != (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used[key] = self._tick()
+        return row[3]
+
+    def set(self, file_path: str, file_stat: os.stat_result, digest: str, algorithm: str = "MD5"):
+        """Stores the digest of a file, replacing any previous digest of the same path and algorithm."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO hashes (path, algorithm, size, mtime_ns, inode, digest, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(file_path), algorithm, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino,
+             digest, self._tick()))
+
+    def evict(self):
+        """
+        Removes the least recently used digests until the cache holds at most `max_entries`.
+        Returns the number of removed digests.
+        """
+        self._flush_used()
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self._connection.execute(
+            "DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes ORDER BY last_used ASC LIMIT ?)", (excess,))
+        self._connection.commit()
+        return excess
+
+    def prune(self):
+        """
+        Removes the digests of files that no longer exist or have changed since they were hashed,
+        then evicts the least recently used digests beyond `max_entries`.
+        Returns the number of removed digests.
+        """
+        self._flush_used()
+        stale = []
+        rows = self._connection.execute(
+            "SELECT path, algorithm, size, mtime_ns, inode FROM hashes").fetchall()
+        for path, algorithm, size, mtime_ns, inode in rows:
+            try:
+                file_stat = os.stat(path)
+            except OSError:
+                stale.append((path, algorithm))
+                continue
+            if (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino) != (size, mtime_ns, inode):
+                stale.append((path, algorithm))
+        self._connection.executemany(
+            "DELETE FROM hashes WHERE path = ? AND algorithm = ?", stale)
+        self._connection.commit()
+        return len(stale) + self.evict()
+
+    def close(self):
+        """Evicts the digests beyond `max_entries`, writes all the changes to disk and closes the database."""
+        if self._connection is None:
+            return
+        self.evict()
+        self._connection.commit()
+        self._connection.close()
+        self._connection = None
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _flush_used(self):
+        # The uses of cached digests are written in a single batch instead of one write per file.
+        self._connection.executemany(
+            "UPDATE hashes SET last_used = ? WHERE path = ? AND algorithm = ?",
+            [(last_used, path, algorithm) for (path, algorithm), last_used in self._used.items()])
+        self._used = {}
+        self._connection.commit()
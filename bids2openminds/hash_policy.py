@@ -0,0 +1,66 @@
+import re
+from collections import namedtuple
+
+# The policies accepted by `parse_hash_policy`
+HASH_POLICIES = ("full", "none", "max-size=N", "fingerprint")
+
+# The algorithm recorded in the Hash nodes of fingerprints. It is not a standard algorithm: the
+# digest is the MD5 of the size of the file (8 bytes, little endian) followed by its first and last
+# FINGERPRINT_BLOCK_SIZE bytes, or its whole content if it is at most twice as large
+FINGERPRINT_ALGORITHM = "bids2openminds-fingerprint-v1"
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+class HashPolicy(namedtuple("HashPolicy", ["mode", "max_size"])):
+    """
+    Which files are hashed, and how: "full" hashes the whole content of every file, "none"
+    hashes nothing, "max-size" hashes the files smaller than `max_size` bytes and "fingerprint"
+    computes a cheap digest of the size, start and end of every file.
+    """
+
+    def hashes(self, size: int):
+        """Whether a file of `size` bytes gets a digest."""
+        if self.mode == "none":
+            return False
+        if self.mode == "max-size":
+            return size < self.max_size
+        return True
+
+    def read_size(self, size: int):
+        """The number of bytes read from a file of `size` bytes to compute its digest."""
+        if not self.hashes(size):
+            return 0
+        if self.mode == "fingerprint":
+            return min(size, 2 * FINGERPRINT_BLOCK_SIZE)
+        return size
+
+
+def parse_size(size: str):
+    """Parses a number of bytes, with an optional binary unit, e.g. "500M" or "2GiB"."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", size, re.IGNORECASE)
+    if match is None:
+        raise ValueError(
+            f"The size must be a number of bytes with an optional unit among K, M, G and T, you have specified {size}.")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+
+def parse_hash_policy(policy):
+    """
+    Parses a hash policy: "full", "none", "max-size=N" with N a number of bytes with an optional
+    unit (e.g. "max-size=1G"), or "fingerprint". A HashPolicy is returned unchanged.
+
+    Returns:
+    - HashPolicy: The parsed policy.
+    """
+    if isinstance(policy, HashPolicy):
+        return policy
+    mode, _, value = policy.strip().partition("=")
+    mode = mode.strip().lower()
+    if mode in ("full", "none", "fingerprint") and not value:
+        return HashPolicy(mode, None)
+    if mode == "max-size" and value:
+        return HashPolicy(mode, parse_size(value))
+    raise ValueError(
+        f"The hash policy must be one of {', '.join(HASH_POLICIES)}, you have specified {policy}.")
@@ -0,0 +1,90 @@
+import hashlib
+import importlib
+from functools import lru_cache
+
+# The hash algorithms provided by optional packages, by name: (module, constructor)
+OPTIONAL_ALGORITHMS = {
+    "xxh32": ("xxhash", "xxh32"),
+    "xxh64": ("xxhash", "xxh64"),
+    "xxh3_64": ("xxhash", "xxh3_64"),
+    "xxh3_128": ("xxhash", "xxh3_128"),
+    "xxh128": ("xxhash", "xxh128"),
+    "blake3": ("blake3", "blake3"),
+}
+
+
+@lru_cache(maxsize=None)
+def hash_constructor(algorithm: str):
+    """
+    Returns the function creating hash objects for an algorithm: one of `hashlib`, or of the
+    optional xxhash and blake3 packages. The names are case insensitive.
+    """
+    name = algorithm.strip().lower()
+    if name in OPTIONAL_ALGORITHMS:
+        module_name, constructor = OPTIONAL_ALGORITHMS[name]
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            raise ValueError(
+                f"The hash algorithm {algorithm} requires the {module_name} package, install it with 'pip install {module_name}'.") from None
+        return getattr(module, constructor)
+    try:
+        # The digests of the SHAKE algorithms have a variable length, which can't be recorded
+        if hashlib.new(name).digest_size == 0:
+            raise ValueError
+    except ValueError:
+        raise ValueError(
+            f"The hash algorithm must be one of {', '.join(available_algorithms())}, you have specified {algorithm}.") from None
+    return lambda: hashlib.new(name)
+
+
+def available_algorithms():
+    """The names of the supported algorithms, including the optional ones whose package may not be installed."""
+    return sorted({name for name in hashlib.algorithms_available if not name.startswith("shake")}
+                  | OPTIONAL_ALGORITHMS.keys())
+
+
+def algorithm_name(algorithm: str):
+    """The name under which the digests of an algorithm are recorded, e.g. "MD5" or "SHA256"."""
+    return algorithm.strip().upper()
+
+
+def parse_hash_algorithms(algorithms):
+    """
+    Parses a comma separated list of hash algorithms, e.g. "sha256,md5", or a list of them.
+
+    Returns:
+    - tuple: The recorded names of the algorithms, without duplicates, in the given order.
+    """
+    if isinstance(algorithms, str):
+        algorithms = algorithms.split(",")
+    names = []
+    for algorithm in algorithms:
+        hash_constructor(algorithm)
+        if algorithm_name(algorithm) not in names:
+            names.append(algorithm_name(algorithm))
+    if not names:
+        raise ValueError("At least one hash algorithm must be given.")
+    return tuple(names)
+
+
+class MultiHash:
+    """
+    Feeds the same data to the hash objects of several algorithms, so that all the digests of a
+    file are computed from a single read.
+
+    Example:
+    >>> hash_object = MultiHash(["MD5", "SHA256"])
+    >>> hash_object.update(b"data")
+    >>> md5_digest, sha256_digest = hash_object.hexdigests()
+    """
+
+    def __init__(self, algorithms):
+        self.hash_objects = [hash_constructor(algorithm)() for algorithm in algorithms]
+
+    def update(self, data):
+        for hash_object in self.hash_objects:
+            hash_object.update(data)
+
+    def hexdigests(self):
+        return tuple(hash_object.hexdigest() for hash_object in self.hash_objects)
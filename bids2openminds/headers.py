@@ -0,0 +1,94 @@
+import zlib
+
+# The detectors of the format of a file from the first bytes of its content, by extension
+# (without ".gz", the content of compressed files being decompressed): (number of leading
+# bytes needed, function returning the name of the openMINDS ContentType or None)
+HEADER_DETECTORS = {}
+
+
+def register_header_detector(extensions, size: int, detect):
+    """
+    Registers a function detecting the format of the files with the given extensions from the
+    first `size` bytes of their content, which are captured while the files are hashed so that
+    the detection costs no additional read. Gzip compressed files, e.g. ".nii.gz" for ".nii",
+    are detected on their decompressed content.
+
+    Parameters:
+    - extensions (iterable): The extensions of the files, e.g. [".nii"].
+    - size (int): The number of leading bytes needed, fewer are given if the file is shorter.
+    - detect (callable): Called with the leading bytes, returns the name of the ContentType of the file or None.
+    """
+    for extension in extensions:
+        HEADER_DETECTORS[extension] = (size, detect)
+
+
+def header_detector(extension: str):
+    """
+    Returns the detector of the files with the given extension and whether their content is
+    gzip compressed, or None if their format can't be detected from their header.
+    """
+    if extension is None:
+        return None
+    compressed = extension.endswith(".gz")
+    detector = HEADER_DETECTORS.get(extension[:-3] if compressed else extension)
+    if detector is None:
+        return None
+    return detector, compressed
+
+
+class HeaderReader:
+    """
+    Captures the first `size` bytes of the content of a file from the chunks read from it,
+    decompressing only the start of gzip compressed files.
+    """
+
+    def __init__(self, size: int, compressed: bool = False):
+        self.size = size
+        self.header = b""
+        self.complete = size == 0
+        # wbits=31 expects a gzip header
+        self._decompressor = zlib.decompressobj(wbits=31) if compressed else None
+
+    def feed(self, chunk):
+        """Adds the next chunk read from the file, ignored once enough bytes are captured."""
+        if self.complete:
+            return
+        missing = self.size - len(self.header)
+        if self._decompressor is None:
+            self.header += bytes(chunk[:missing])
+        else:
+            try:
+                self.header += self._decompressor.decompress(chunk, missing)
+            except zlib.error:
+                # Not a gzip file, its format is unknown
+                self.header = b""
+                self.complete = True
+                return
+        self.complete = len(self.header) >= self.size
+
+
+def nifti_version(header: bytes):
+    """
+    Returns the NIfTI version (1 or 2) from the first four bytes of a NIfTI file, which give
+    the size of its header in either byte order, or None if it is not a NIfTI file.
+    """
+    nii1_sizeof_hdr = 348
+    nii2_sizeof_hdr = 540
+
+    for byteorder in ("little", "big"):
+        sizeof_hdr = int.from_bytes(header[:4], byteorder=byteorder)
+        if sizeof_hdr == 0:
+            return None
+        if sizeof_hdr == nii1_sizeof_hdr:
+            return 1
+        if sizeof_hdr == nii2_sizeof_hdr:
+            return 2
+    return None
+
+
+def nifti_format(header: bytes):
+    version = nifti_version(header)
+    return f"application/vnd.nifti.{version}" if version is not None else None
+
+
+register_header_detector([".nii"], 4, nifti_format)
@@ -0,0 +1,83 @@
+import glob
+import json
+import os
+import pathlib
+
+FILE_TYPE = "https://openminds.ebrains.eu/core/File"
+
+
+class PreviousConversion:
+    """
+    The File nodes of a previous conversion of the same dataset, used to avoid hashing
+    and probing again the files that did not change since then.
+
+    A file is considered unchanged if a File node with the same IRI and storage size was
+    recorded in the previous output and the file was not modified after the output was written.
+
+    Parameters:
+    - output_path (str): The previous output, either a single JSON-LD file or the directory
+      written with `multiple_files=True`.
+    """
+
+    def __init__(self, output_path: str):
+        if os.path.isdir(output_path):
+            paths = glob.glob(os.path.join(output_path, "**", "*.jsonld"), recursive=True)
+        else:
+            paths = [output_path]
+
+        self.path = output_path
+        self.files = {}
+        self.reused = 0
+        self.changed = 0
+        self._seen = set()
+        # The oldest output file is used so that no file modified during the previous save is reused
+        self.timestamp_ns = min((os.stat(path).st_mtime_ns for path in paths), default=0)
+
+        for path in paths:
+            with open(path, "r") as file:
+                data = json.load(file)
+            for node in data.get("@graph", [data]):
+                if node.get("@type") == FILE_TYPE:
+                    self.files[node["IRI"]] = node
+
+    def __len__(self):
+        return len(self.files)
+
+    def get(self, file_path: str, file_stat: os.stat_result):
+        """
+        Returns the File node recorded for a file in the previous output as a JSON-LD dictionary,
+        or None if the file is new or has changed.
+        """
+        iri = pathlib.Path(file_path).absolute().as_uri()
+        self._seen.add(iri)
+        node = self.files.get(iri)
+        if (node is None or file_stat.st_mtime_ns > self.timestamp_ns
+                or node.get("storageSize", {}).get("value") != file_stat.st_size):
+            self.changed += 1
+            return None
+        self.reused += 1
+        return node
+
+    @property
+    def removed(self):
+        """The number of files in the previous output that were not looked up in this conversion."""
+        return len(self.files.keys() - self._seen)
+
+
+def previous_digest(node: dict, algorithm: str = "MD5"):
+    """Returns the digest for `algorithm` recorded in a File node, or None."""
+    hashes = node.get("hash") or []
+    if isinstance(hashes, dict):
+        hashes = [hashes]
+    for file_hash in hashes:
+        if file_hash.get("algorithm") == algorithm:
+            return file_hash.get("digest")
+    return None
+
+
+def previous_format_id(node: dict):
+    """Returns the identifier of the content type recorded in a File node, or None."""
+    file_format = node.get("format")
+    if file_format is None:
+        return None
+    return file_format.get("@id")
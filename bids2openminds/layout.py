@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import re
+import warnings
+
+# Name of the file, stored next to the pybids database, recording the state of the tree that was indexed
+SIGNATURE_FILE_NAME = "bids2openminds_signature.json"
+
+# The backends available to index a dataset
+BACKENDS = ("pybids", "fast")
+
+# The filename entities used by the conversion, with the patterns pybids uses to parse them
+ENTITY_PATTERNS = {
+    "subject": re.compile(r"[/\\]+sub-([a-zA-Z0-9]+)"),
+    "session": re.compile(r"[_/\\]+ses-([a-zA-Z0-9]+)"),
+    "task": re.compile(r"[_/\\]+task-([a-zA-Z0-9]+)"),
+    "run": re.compile(r"[_/\\]+run-(\d+)"),
+    "suffix": re.compile(r"(?:^|[_/\\])([a-zA-Z0-9]+)\.[^/\\]+$"),
+    "datatype": re.compile(r"[/\\]+(anat|beh|dwi|eeg|fmap|func|ieeg|meg|micr|motion|mrs|nirs|perf|pet)[/\\]+"),
+    "extension": re.compile(r"[^./\\](\.[^/\\]+)$"),
+}
+
+# The paths, relative to the root of the dataset, that pybids doesn't index by default
+IGNORED_PATTERNS = (re.compile(r"^/(code|models|sourcedata|stimuli)"),
+                    re.compile(r"/\."),
+                    re.compile(r"^/derivatives/[^/]+/"))
+
+# The paths of the files that the BIDS validator accepts, and pybids indexes: the top level files, the phenotype
+# tables and the files of the subjects, whose names are a list of entities followed by a suffix and a BIDS
+# extension, or which are inside a CTF (.ds) or MEF3 (.mefd) directory
+ENTITY_NAME = r"(?:[a-zA-Z0-9]+-[a-zA-Z0-9]+_)*[a-zA-Z0-9]+"
+BIDS_EXTENSION = (r"(?:nii(?:\.gz)?|json|tsv(?:\.gz)?|bval|bvec|edf|bdf|set|fdt|vhdr|vmrk|eeg|fif|con|sqd|mrk|kdf"
+                  r"|chn|trg|raw|mhd|pos|snirf|nwb|png|jpg|tif|ome\.tif|ome\.btf|(?:ds|mefd)/.+)")
+BIDS_PATH_PATTERN = re.compile(
+    r"/(?:dataset_description\.json|README(?:\.[a-z]+)?|CHANGES|LICENSE|CITATION\.cff|genetic_info\.json"
+    r"|(?:participants|samples)\.(?:tsv|json)"
+    rf"|{ENTITY_NAME}\.(?:json|tsv|bval|bvec)"
+    r"|phenotype/[^/]+\.(?:tsv|json)"
+    rf"|sub-[a-zA-Z0-9]+/(?:[^/]+/)*sub-[a-zA-Z0-9]+(?:_[a-zA-Z0-9]+-[a-zA-Z0-9]+)*_[a-zA-Z0-9]+\.{BIDS_EXTENSION})")
+
+
+class DataFrameLayout:
+    """
+    A minimal stand-in for `bids.BIDSLayout` built from a layout table, as returned by
+    `BIDSLayout.to_df()`. It provides the parts of the layout used by the conversion.
+
+    Parameters:
+    - layout_df (pd.DataFrame): The layout table, with at least the "path", "subject", "session",
+      "task", "suffix", "datatype" and "extension" columns.
+    - listings (dict, optional): The `os.DirEntry` list of every directory of the dataset, by path
+      relative to its root, when the tree was walked to build the layout (see `scan_layout`).
+    """
+
+    def __init__(self, layout_df, listings=None):
+        self._layout_df = layout_df
+        self.listings = listings
+
+    def to_df(self):
+        return self._layout_df
+
+    def _unique(self, column):
+        if column not in self._layout_df.columns:
+            return []
+        return sorted(self._layout_df[column].dropna().unique().tolist())
+
+    def get_subjects(self):
+        return self._unique("subject")
+
+    def get_sessions(self):
+        return self._unique("session")
+
+    def get_tasks(self):
+        return self._unique("task")
+
+
+def parse_entities(relative_path: str):
+    """
+    Parses the BIDS entities of a file from its path, the same way pybids does.
+
+    Parameters:
+    - relative_path (str): The path of the file relative to the root of the dataset, in posix form
+      and starting with "/", e.g. "/sub-01/anat/sub-01_T1w.nii.gz".
+
+    Returns:
+    - dict: The value of each entity of ENTITY_PATTERNS found in the path.
+
+    Example:
+    >>> parse_entities("/sub-01/func/sub-01_task-rest_run-1_bold.nii.gz")
+    {'subject': '01', 'task': 'rest', 'run': 1, 'suffix': 'bold', 'datatype': 'func', 'extension': '.nii.gz'}
+    """
+    entities = {}
+    for name, pattern in ENTITY_PATTERNS.items():
+        match = pattern.search(relative_path)
+        if match is not None:
+            entities[name] = int(match.group(1)) if name == "run" else match.group(1)
+    return entities
+
+
+def scan_layout(input_path: str):
+    """
+    Indexes a BIDS dataset without pybids, parsing the entities of each file from its name during
+    a single walk of the tree. The same files as pybids are indexed: the files whose path follows
+    BIDS_PATH_PATTERN, outside of the derivatives, code, models, sourcedata and stimuli
+    directories and excluding hidden files.
+
+    The whole tree is walked, but for the openminds output directories, and the entries of each
+    directory are kept in the `listings` of the layout, so that `main.create_file_bundle` creates
+    the file bundles without listing the directories again.
+
+    Parameters:
+    - input_path (str): The path to the BIDS directory.
+
+    Returns:
+    - DataFrameLayout: The layout of the dataset, with one row per file in the order of pybids.
+    """
+    root = os.path.abspath(input_path)
+    records = []
+    listings = {}
+    directories = [root]
+    while directories:
+        directory = directories.pop()
+        with os.scandir(directory) as scanned:
+            entries = listings[os.path.relpath(directory, root)] = list(scanned)
+        for entry in entries:
+            relative_path = "/" + \
+                os.path.relpath(entry.path, root).replace(os.sep, "/")
+            is_directory = entry.is_dir()
+            if is_directory and entry.name != "openminds":
+                directories.append(entry.path)
+            # Like pybids, .zarr directories are indexed as files
+            if is_directory and not entry.name.endswith(".zarr"):
+                continue
+            if any(pattern.search(relative_path) for pattern in IGNORED_PATTERNS):
+                continue
+            if BIDS_PATH_PATTERN.fullmatch(relative_path):
+                records.append(
+                    {"path": entry.path, **parse_entities(relative_path)})
+
+    # pybids lists the files by path, followed by the files without any entity such as README
+    records.sort(key=lambda record: (len(record) == 1, record["path"]))
+    import pandas as pd
+    return DataFrameLayout(pd.DataFrame(records, columns=["path", *ENTITY_PATTERNS]), listings=listings)
+
+
+def tree_signature(input_path: str, ignore=()):
+    """
+    Computes a digest of the paths, sizes and modification times of all the files in a directory tree,
+    which changes whenever a file is added, removed or modified. The paths pybids doesn't index
+    (IGNORED_PATTERNS), such as .git, are left out, and the symbolic links to directories are not
+    followed, so that a link to one of their parents doesn't make the walk endless.
+
+    Parameters:
+    - input_path (str): The root of the tree.
+    - ignore (iterable, optional): Absolute paths of files and directories left out of the signature.
+
+    Returns:
+    - str: The hexadecimal digest of the state of the tree.
+    """
+    ignore = {os.path.abspath(path) for path in ignore}
+    root = os.path.abspath(input_path)
+    entries = []
+    directories = [root]
+    while directories:
+        with os.scandir(directories.pop()) as scanned:
+            for entry in scanned:
+                if entry.path in ignore:
+                    continue
+                is_directory = entry.is_dir(follow_symlinks=False)
+                relative_path = "/" + os.path.relpath(entry.path, root).replace(os.sep, "/")
+                if any(pattern.search(relative_path + "/" if is_directory else relative_path)
+                       for pattern in IGNORED_PATTERNS):
+                    continue
+                if is_directory:
+                    directories.append(entry.path)
+                else:
+                    file_stat = entry.stat(follow_symlinks=False)
+                    entries.append(
+                        f"{os.path.relpath(entry.path, input_path)}\t{file_stat.st_size}\t{file_stat.st_mtime_ns}")
+
+    signature = hashlib.sha256()
+    for entry in sorted(entries):
+        signature.update(entry.encode("utf-8", "surrogateescape"))
+        signature.update(b"\n")
+    return signature.hexdigest()
+
+
+def cached_bids_layout(input_path: str, layout_db: str):
+    """
+    Returns the pybids layout of a dataset, stored in the database directory `layout_db`.
+    The stored index is reused if the tree didn't change since it was built, otherwise the
+    dataset is indexed again and the database replaced.
+    """
+    from bids import BIDSLayout
+
+    input_path = os.path.abspath(input_path)
+    layout_db = os.path.abspath(layout_db)
+    signature_path = os.path.join(layout_db, SIGNATURE_FILE_NAME)
+
+    # The outputs of the conversion and the database itself don't change the index
+    signature = {"root": input_path,
+                 "tree": tree_signature(input_path, ignore=(layout_db,
+                                                            os.path.join(input_path, "openminds"),
+                                                            os.path.join(input_path, "openminds.jsonld")))}
+
+    previous_signature = None
+    if os.path.isfile(signature_path):
+        with open(signature_path, "r") as file:
+            previous_signature = json.load(file)
+
+    reset_database = previous_signature != signature
+    bids_layout = BIDSLayout(
+        input_path, database_path=layout_db, reset_database=reset_database)
+
+    if reset_database:
+        with open(signature_path, "w") as file:
+            json.dump(signature, file, indent=2)
+
+    return bids_layout
+
+
+def load_layout(input_path: str, layout=None, layout_db: str = None, backend: str = "pybids"):
+    """
+    Returns the layout of a BIDS dataset.
+
+    Parameters:
+    - input_path (str): The path to the BIDS directory.
+    - layout (BIDSLayout or pd.DataFrame, optional): An already built layout, or its table as
+      returned by `BIDSLayout.to_df()`, in which case the dataset is not indexed again.
+    - layout_db (str, optional): A directory in which the pybids index is stored and reused
+      across runs as long as the dataset doesn't change.
+    - backend (str, optional): "pybids" to index the dataset with pybids, or "fast" to parse the
+      entities from the file names with `scan_layout`. Default is "pybids".
+
+    Returns:
+    - BIDSLayout or DataFrameLayout: An object providing `to_df`, `get_subjects`, `get_sessions` and `get_tasks`.
+    """
+    # pandas and pybids are imported on first use, see converter.convert, and pybids only by its backend
+    import pandas as pd
+
+    if layout is not None:
+        if isinstance(layout, pd.DataFrame):
+            return DataFrameLayout(layout)
+        return layout
+
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"The layout backend must be one of {', '.join(BACKENDS)}, you have specified {backend}.")
+
+    if backend == "fast":
+        if layout_db is not None:
+            warnings.warn(
+                "The layout database is only used by the pybids backend and was ignored.")
+        return scan_layout(input_path)
+
+    if layout_db is not None:
+        return cached_bids_layout(input_path, layout_db)
+
+    from bids import BIDSLayout
+    return BIDSLayout(input_path)
@@ -1,6 +1,9 @@
 import re
 import os
 import pathlib
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from warnings import warn
 
 import pandas as pd
@@ -10,8 +13,16 @@ import openminds.v3.core as omcore
 import openminds.v3.controlled_terms as controlled_terms
 from openminds import IRI
 
-from .utility import table_filter, pd_table_value, file_hash, file_storage_size, detect_nifti_version
+from .annex import annex_key, content_present, content_size
+from .utility import table_filter, pd_table_value, probe_file, storage_size_openminds
+from .hash_policy import FINGERPRINT_ALGORITHM, parse_hash_policy
+from .hashing import parse_hash_algorithms
+from .incremental import previous_digest, previous_format_id
+from .resolver import content_type_by_id
+from .profiling import Profiler
 from . import mapping
+from . import pipeline
+from . import resolver
 
 
 def create_openminds_person(full_name):
@@ -95,69 +106,41 @@ def create_behavioral_protocol(layout, collection):
 
 
 def techniques_openminds(suffix):
-    possible_types = ["Technique", "AnalysisTechnique", "StimulationApproach",
-                      "StimulationTechnique"]
-
-    if suffix in mapping.MAP_2_TECHNIQUES:
-        items_openminds = mapping.MAP_2_TECHNIQUES[suffix]
-    else:
-        return []
-
-    if items_openminds is None:
-        return []
-
-    openminds_techniques_list = []
-    for item_openminds in items_openminds:
-        for possible_type in possible_types:
-            openminds_type = getattr(controlled_terms, possible_type)
-            openminds_obj = None
-            try:
-                openminds_obj = openminds_type.by_name(item_openminds)
-                break
-            except KeyError:
-                pass
-        if openminds_obj:
-            openminds_techniques_list.append(openminds_obj)
-    return openminds_techniques_list
+    return resolver.techniques(suffix)
 
 
 def create_techniques(layout_df):
     suffixs = layout_df["suffix"].unique().tolist()
     techniques = []
     not_techniques_index = ["description", "participants", "events"]
+    unresolved_techniques = resolver.unresolved_terms()["techniques"]
     for suffix in suffixs:
         # excluding the None and non thechnique indexes
         if not (pd.isnull(suffix) or (suffix in not_techniques_index)):
             openminds_techniques_cache = techniques_openminds(suffix)
             techniques.extend(openminds_techniques_cache)
+            if suffix in unresolved_techniques:
+                warn(
+                    f"The techniques {unresolved_techniques[suffix]} of {suffix} are not available in openMINDS and were not added.")
 
-    techniques_set = set(techniques)
-    techniques_list = list(techniques_set)
+    # removing the duplicates while keeping the order of the dataset
+    techniques_list = list(dict.fromkeys(techniques))
     return techniques_list or None
 
 
 def approaches_openminds(datatype):
-
-    if datatype in mapping.MAP_2_EXPERIMENTAL_APPROACHES:
-        items_openminds = mapping.MAP_2_EXPERIMENTAL_APPROACHES[datatype]
-
-    approches_list = []
-
-    for item in items_openminds:
-        approches_list.append(
-            controlled_terms.ExperimentalApproach.by_name(item))
-
-    return approches_list
+    return resolver.approaches(datatype)
 
 
 def create_approaches(layout_df):
     datatypes = layout_df["datatype"].unique().tolist()
-    approaches = set([])
+    approaches = []
     for datatype in datatypes:
         if not (pd.isnull(datatype)):
-            approaches.update(approaches_openminds(datatype))
+            approaches.extend(approaches_openminds(datatype))
 
-    return list(approaches) or None
+    # removing the duplicates while keeping the order of the dataset
+    return list(dict.fromkeys(approaches)) or None
 
 
 def create_openminds_age(data_subject):
@@ -167,6 +150,11 @@ def create_openminds_age(data_subject):
     except:
         return None
 
+    return age_openminds(age)
+
+
+def age_openminds(age):
+
     if age is None or pd.isna(age):
         return None
     elif isinstance(age, float) or isinstance(age, int) or age.isnumeric():
@@ -270,32 +258,37 @@ def create_dataset(dataset_description, dataset_version, collection):
 
 
 def spices_openminds(data_subject: pd.DataFrame):
-    bids_species = pd_table_value(data_subject, "species")
+    return species_value_openminds(pd_table_value(data_subject, "species"))
+
+
+def species_value_openminds(bids_species):
     if bids_species is None:
         # In BIDS the default species is homo sapiens.
         return controlled_terms.Species.homo_sapiens
     if bids_species in mapping.MAP_2_SPECIES:
         openminds_species = mapping.MAP_2_SPECIES[bids_species]
-        return controlled_terms.Species.by_name(openminds_species[0])
+        return resolver.controlled_term("Species", openminds_species[0])
     else:
-        try:
-            openminds_species = controlled_terms.Species.by_name(bids_species)
+        openminds_species = resolver.controlled_term("Species", bids_species)
+        if openminds_species is not None:
             warn(
                 f"You have specified {bids_species} as species, we have autodetected {openminds_species.name}, please verify it.")
             return openminds_species
-        except KeyError:
-            warn(
-                f"You have specified {bids_species} we currently don't support this species.")
+        warn(
+            f"You have specified {bids_species} we currently don't support this species.")
         return None
 
 
 def handedness_openminds(data_subject: pd.DataFrame):
-    bids_handedness = pd_table_value(data_subject, "handedness")
+    return handedness_value_openminds(pd_table_value(data_subject, "handedness"))
+
+
+def handedness_value_openminds(bids_handedness):
     if bids_handedness is None:
         return None
     if bids_handedness in mapping.MAP_2_HANDEDNESS:
         openminds_handedness = mapping.MAP_2_HANDEDNESS[bids_handedness]
-        return controlled_terms.Handedness.by_name(openminds_handedness[0])
+        return resolver.controlled_term("Handedness", openminds_handedness[0])
     else:
         warn(
             f"You have specified {bids_handedness} which is not a allowed value for handedness defined by BIDS standard.")
@@ -303,21 +296,90 @@ def handedness_openminds(data_subject: pd.DataFrame):
 
 
 def sex_openminds(data_subject: pd.DataFrame):
-    bids_sex = pd_table_value(data_subject, "sex")
+    return sex_value_openminds(pd_table_value(data_subject, "sex"))
+
+
+def sex_value_openminds(bids_sex):
     if bids_sex is None:
         return None
     if bids_sex in mapping.MAP_2_BIOLOGICALSEX:
         bids_sex = mapping.MAP_2_BIOLOGICALSEX[bids_sex]
-        return controlled_terms.BiologicalSex.by_name(bids_sex[0])
+        return resolver.controlled_term("BiologicalSex", bids_sex[0])
     else:
         warn(
             f"You have specified {bids_sex} which is not a allowed value for handedness defined by BIDS standard.")
         return None
 
 
+def map_unique_values(column: pd.Series, function):
+    """
+    Applies `function` once per distinct value of a column (missing values included)
+    and returns the results for all the rows, in order.
+    """
+    codes, uniques = pd.factorize(column)
+    results = [function(value) for value in uniques.tolist()]
+    if (codes == -1).any():
+        missing_result = function(float("nan"))
+    else:
+        missing_result = None
+    return [results[code] if code >= 0 else missing_result for code in codes]
+
+
+# participants.tsv column -> function mapping its values to openMINDS
+PARTICIPANTS_ATTRIBUTES = {"age": age_openminds,
+                           "handedness": handedness_value_openminds,
+                           "sex": sex_value_openminds,
+                           "species": species_value_openminds}
+
+
+def participants_openminds(participants_table: pd.DataFrame):
+    """
+    Maps the participants table to openMINDS column by column, resolving each distinct value only once.
+
+    Returns:
+    - dict: For each participant_id, a dictionary with its openMINDS "age", "handedness", "sex" and "species".
+    """
+    # As when filtering the table by participant, only the first row of each participant is used
+    participants_table = participants_table.drop_duplicates(
+        "participant_id")
+    participants_id = participants_table["participant_id"].tolist()
+
+    attributes = {}
+    for column, function in PARTICIPANTS_ATTRIBUTES.items():
+        if column in participants_table.columns:
+            attributes[column] = map_unique_values(
+                participants_table[column], function)
+        else:
+            attributes[column] = [function(None)] * len(participants_id)
+
+    return {participant_id: {column: attributes[column][index] for column in attributes}
+            for index, participant_id in enumerate(participants_id)}
+
+
+def missing_participant_openminds(participants_table: pd.DataFrame):
+    """The openMINDS attributes of a subject that is not listed in the participants table."""
+    data_subject = participants_table.iloc[0:0]
+    return {"age": create_openminds_age(data_subject),
+            "handedness": handedness_openminds(data_subject),
+            "sex": sex_openminds(data_subject),
+            "species": spices_openminds(data_subject)}
+
+
+def subject_session_pairs(layout_df):
+    """
+    Returns the set of (subject, session) pairs that have at least one file in the layout table,
+    built once so that the presence of a session can be checked in constant time.
+    """
+    if not {"subject", "session"}.issubset(layout_df.columns):
+        return set()
+    pairs = layout_df[["subject", "session"]].dropna().drop_duplicates()
+    return set(pairs.itertuples(index=False, name=None))
+
+
 def create_subjects(subject_id, layout_df, layout, collection):
 
     sessions = layout.get_sessions()
+    subject_sessions = subject_session_pairs(layout_df) if sessions else set()
     subjects_dict = {}
     subjects_list = []
     subject_state_dict = {}
@@ -343,7 +405,7 @@ def create_subjects(subject_id, layout_df, layout, collection):
             else:
                 # create a subject state for each state
                 for session in sessions:
-                    if not (table_filter(table_filter(layout_df, session, "session"), subject, "subject").empty):
+                    if (subject, session) in subject_sessions:
                         state = omcore.SubjectState(
                             internal_identifier=f"Studied state {subject_name} {session}".strip(
                             ),
@@ -370,16 +432,24 @@ def create_subjects(subject_id, layout_df, layout, collection):
         participants_paths, ".tsv", "extension"), "path")
 
     participants_table = pd.read_csv(participants_path_tsv, sep="\t", header=0)
+    # The attributes of the participants are resolved once and shared by all the states of a subject
+    participants = participants_openminds(participants_table)
+    missing_participant = None
     for subject in subject_id:
         subject_name = f"sub-{subject}"
-        data_subject = table_filter(
-            participants_table, subject_name, "participant_id")
+        if subject_name in participants:
+            participant = participants[subject_name]
+        else:
+            if missing_participant is None:
+                missing_participant = missing_participant_openminds(
+                    participants_table)
+            participant = missing_participant
         state_cache_dict = {}
         state_cache = []
         if not sessions:
             state = omcore.SubjectState(
-                age=create_openminds_age(data_subject),
-                handedness=handedness_openminds(data_subject),
+                age=participant["age"],
+                handedness=participant["handedness"],
                 internal_identifier=f"Studied state {subject_name}".strip(),
                 lookup_label=f"Studied state {subject_name}".strip()
             )
@@ -388,10 +458,10 @@ def create_subjects(subject_id, layout_df, layout, collection):
             state_cache.append(state)
         else:
             for session in sessions:
-                if not (table_filter(table_filter(layout_df, session, "session"), subject, "subject").empty):
+                if (subject, session) in subject_sessions:
                     state = omcore.SubjectState(
-                        age=create_openminds_age(data_subject),
-                        handedness=handedness_openminds(data_subject),
+                        age=participant["age"],
+                        handedness=participant["handedness"],
                         internal_identifier=f"Studied state {subject_name} {session}".strip(
                         ),
                         lookup_label=f"Studied state {subject_name} {session}".strip(
@@ -402,11 +472,11 @@ def create_subjects(subject_id, layout_df, layout, collection):
                     state_cache.append(state)
             subject_state_dict[f"{subject}"] = state_cache_dict
         subject_cache = omcore.Subject(
-            biological_sex=sex_openminds(data_subject),
+            biological_sex=participant["sex"],
             lookup_label=f"{subject_name}",
             internal_identifier=f"{subject_name}",
             # TODO species should default to homo sapiens
-            species=spices_openminds(data_subject),
+            species=participant["species"],
             studied_states=state_cache
         )
         subjects_dict[f"{subject}"] = subject_cache
@@ -416,10 +486,24 @@ def create_subjects(subject_id, layout_df, layout, collection):
     return subjects_dict, subject_state_dict, subjects_list
 
 
-def create_file_bundle(BIDS_path, path, collection, parent_file_bundle=None, is_file_repository=False):
+def create_file_bundle(BIDS_path, path, collection, parent_file_bundle=None, is_file_repository=False, file_stats=None,
+                       progress=None, annex_keys=None, listings=None):
+    """
+    Creates the file bundles of a directory and all its subdirectories in a single scan
+    of the tree, the storage size of each bundle being the total size of its files.
+
+    If `file_stats` is a dictionary, the `os.stat_result` of every file found is stored
+    in it by path, so that the files don't need to be stat'ed again.
+    If `annex_keys` is a dictionary, the AnnexKey of every git-annex file found is stored in it
+    by path. The annexed files whose content isn't present are kept, with the `os.stat_result`
+    of their symbolic link and the size recorded in their key.
+    The files found in each directory are reported to `progress`, if given.
+    If `listings` is given, the entries of the directories found in it are taken from it
+    instead of listing the directories again (see `layout.scan_layout`).
+    """
 
     if is_file_repository:
-        openminds_file_bundle = omcore.FileRepository(format=omcore.ContentType.by_name("application/vnd.bids"),
+        openminds_file_bundle = omcore.FileRepository(format=resolver.controlled_term("ContentType", "application/vnd.bids"),
                                                       iri=IRI(pathlib.Path(BIDS_path).absolute().as_uri()))
     else:
         relative_path = os.path.relpath(path, BIDS_path)
@@ -432,25 +516,44 @@ def create_file_bundle(BIDS_path, path, collection, parent_file_bundle=None, is_
 
     files = {}
     files_size = 0
-    all = os.listdir(path)
+    directory_files = 0
+    directory_size = 0
 
-    for item in all:
+    # scandir gets the type of the entries with the directory listing, so only the files need a stat call
+    entries = listings.pop(os.path.relpath(path, BIDS_path), None) if listings is not None else None
+    if entries is None:
+        with os.scandir(path) as scanned:
+            entries = list(scanned)
+    for entry in entries:
 
-        item_path = str(pathlib.PurePath(path, item))
+        item_path = str(pathlib.PurePath(path, entry.name))
+        key = annex_key(entry.path) if entry.is_symlink() else None
 
-        if os.path.isfile(item_path) and os.path.basename(item_path) != "openminds.jsonld":
+        if (entry.is_file() or key is not None) and entry.name != "openminds.jsonld":
 
             if is_file_repository:
                 files[item_path] = None
             else:
                 files[item_path] = [openminds_file_bundle]
 
-            files_size += os.stat(item_path).st_size
+            try:
+                file_stat = entry.stat()
+            except FileNotFoundError:
+                # The content of the annexed file isn't present, the stat is the one of its link
+                file_stat = entry.stat(follow_symlinks=False)
+            if file_stats is not None:
+                file_stats[item_path] = file_stat
+            if key is not None and annex_keys is not None:
+                annex_keys[item_path] = key
+
+            directory_files += 1
+            directory_size += content_size(file_stat, key)
 
-        if os.path.isdir(item_path) and os.path.basename(item_path) != "openminds":
+        elif entry.is_dir() and entry.name != "openminds":
 
             child_files, child_filesizes, _ = create_file_bundle(
-                BIDS_path, item_path, collection, parent_file_bundle=openminds_file_bundle, is_file_repository=False)
+                BIDS_path, item_path, collection, parent_file_bundle=openminds_file_bundle, is_file_repository=False,
+                file_stats=file_stats, progress=progress, annex_keys=annex_keys, listings=listings)
 
             for child_file_path in child_files.keys():
                 if child_file_path not in files:
@@ -460,10 +563,11 @@ def create_file_bundle(BIDS_path, path, collection, parent_file_bundle=None, is_
 
             files_size += child_filesizes
 
-    openminds_file_bundle.storage_size = omcore.QuantitativeValue(value=files_size,
-                                                                  unit=controlled_terms.UnitOfMeasurement.by_name(
-                                                                      "byte")
-                                                                  )
+    files_size += directory_size
+    if progress is not None:
+        progress.advance(files=directory_files, bytes_done=directory_size)
+
+    openminds_file_bundle.storage_size = storage_size_openminds(files_size)
     collection.add(openminds_file_bundle)
 
     if is_file_repository:
@@ -474,69 +578,273 @@ def create_file_bundle(BIDS_path, path, collection, parent_file_bundle=None, is_
     return files, files_size, openminds_file_repository
 
 
-def create_file(layout_df, BIDS_path, collection):
+def file_description(has_subject, extension, suffix):
+    """
+    Looks up the description of a kind of file in `mapping.MAP_2_FILE_DESCRIPTIONS` and
+    resolves its openMINDS data type and content type.
 
-    BIDS_path_absolute = pathlib.Path(BIDS_path).absolute()
-
-    file2file_bundle_dic, _, file_repository = create_file_bundle(
-        BIDS_path_absolute, BIDS_path_absolute, collection, is_file_repository=True)
+    Returns:
+    - tuple: (content description template, DataType, ContentType, whether to detect the format from the header),
+      or None if the kind of file is not described.
+    """
+    description = mapping.MAP_2_FILE_DESCRIPTIONS.get((has_subject, extension, suffix)) or \
+        mapping.MAP_2_FILE_DESCRIPTIONS.get((has_subject, extension, None))
+    if description is None:
+        return None
+    data_type = resolver.controlled_term("DataType", description["data_type"])
+    file_format = resolver.controlled_term(
+        "ContentType", description["format"]) if description["format"] else None
+    return description["content_description"], data_type, file_format, description.get("detect_format", False)
+
+
+def describe_files(layout_df):
+    """
+    Describes all the files of the layout table at once: the description of each distinct
+    (has subject, extension, suffix) combination is resolved only once and then mapped on all its files.
+
+    Returns:
+    - tuple: lists of the extensions, whether to detect the format from the header, content descriptions,
+      data types and content types of the files, in the order of `layout_df`.
+    """
+    files_kind = pd.DataFrame({"has_subject": layout_df["subject"].notna(),
+                               "extension": layout_df["extension"].astype(object),
+                               "suffix": layout_df["suffix"].astype(object)})
+    files_kind = files_kind.where(files_kind.notna(), None)
+    kinds = list(files_kind.itertuples(index=False, name=None))
+    descriptions = {kind: file_description(*kind) for kind in set(kinds)}
+
+    extensions = files_kind["extension"].tolist()
+    detect_format = []
+    content_descriptions = []
+    data_types = []
+    file_formats = []
+    for kind, suffix, subject in zip(kinds, files_kind["suffix"], layout_df["subject"].tolist()):
+        description = descriptions[kind]
+        if description is None:
+            content_descriptions.append(None)
+            data_types.append(None)
+            file_formats.append(None)
+            detect_format.append(False)
+            continue
+        content_description, data_type, file_format, detect = description
+        content_descriptions.append(
+            content_description.format(suffix=suffix, subject=subject))
+        data_types.append(data_type)
+        file_formats.append(file_format)
+        detect_format.append(detect)
+
+    return extensions, detect_format, content_descriptions, data_types, file_formats
+
+
+def probe_files(paths, detect_format, extensions, compute_digest, jobs=1, sizes=None, progress=None,
+                fingerprint=False, algorithms=("MD5",)):
+    """
+    Runs `utility.probe_file` over all the files, using a pool of `jobs` worker threads
+    when `jobs` is larger than one. The results are returned in the order of `paths`.
+    Each probed file is reported to `progress`, if given, with its size from `sizes`.
+    """
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+    probe = partial(probe_file, fingerprint=fingerprint, algorithms=algorithms)
+
+    if jobs == 1 or len(paths) < 2:
+        return report_probes(map(probe, paths, detect_format, extensions, compute_digest), sizes, progress)
+
+    # Hashing and reading release the GIL, so threads are enough to use all the cores and the storage bandwidth
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return report_probes(executor.map(probe, paths, detect_format, extensions, compute_digest), sizes,
+                             progress)
+
+
+def report_probes(probes, sizes, progress):
+    # Collects the results of the probes, reporting each of them to progress
+    if progress is None:
+        return list(probes)
+    results = []
+    for probe, size in zip(probes, sizes):
+        results.append(probe)
+        progress.advance(files=1, bytes_done=size)
+    return results
+
+
+def all_digests(lookup, algorithms):
+    # The digests of all the algorithms returned by lookup(algorithm), or None if any of them is unknown
+    digests = tuple(lookup(algorithm) for algorithm in algorithms)
+    return None if None in digests else digests
+
+
+def create_file(layout_df, BIDS_path, collection, jobs=1, hash_cache=None, previous_conversion=None, profiler=None,
+                progress=None, io_concurrency=None, hash_policy=None, hash_algorithms=("MD5",), checksum_manifest=None,
+                verify_checksums=0, listings=None):
 
+    BIDS_path_absolute = pathlib.Path(BIDS_path).absolute()
+    # The scan of the tree and the reading of the files are recorded as stages of the profile
+    profiler = profiler or Profiler()
+
+    file_stats = {}
+    annex_keys = {}
+    with profiler.stage("scan"):
+        if progress is not None:
+            progress.start("scan")
+        file2file_bundle_dic, _, file_repository = create_file_bundle(
+            BIDS_path_absolute, BIDS_path_absolute, collection, is_file_repository=True, file_stats=file_stats,
+            progress=progress, annex_keys=annex_keys, listings=listings)
+        if progress is not None:
+            progress.finish()
+        profiler.add(files=len(file_stats))
+
+    paths = layout_df["path"].tolist()
+    extensions, detect_format, content_descriptions, data_types, file_formats = describe_files(
+        layout_df)
+
+    # The stats recorded while scanning the tree are reused, only files missing from the scan are stat'ed
+    files_stat = [file_stats.get(str(pathlib.Path(path))) for path in paths]
+    missing = [index for index, file_stat in enumerate(files_stat) if file_stat is None]
+    if missing:
+        missing_paths = [paths[index] for index in missing]
+        missing_stats = pipeline.stat_files(missing_paths, io_concurrency) if io_concurrency else \
+            [os.stat(path) for path in missing_paths]
+        for index, file_stat in zip(missing, missing_stats):
+            files_stat[index] = file_stat
+
+    # The size and digest of git-annex files are taken from their key, their content may not be present
+    keys = [annex_keys.get(str(pathlib.Path(path))) for path in paths]
+    present = [content_present(file_stat) for file_stat in files_stat]
+    sizes = [content_size(file_stat, key) for file_stat, key in zip(files_stat, keys)]
+
+    # The hash policy decides which files get digests, all of them computed with the same algorithms
+    hash_policy = parse_hash_policy(hash_policy or "full")
+    fingerprint = hash_policy.mode == "fingerprint"
+    algorithms = (FINGERPRINT_ALGORITHM,) if fingerprint else parse_hash_algorithms(hash_algorithms)
+    hashed = [hash_policy.hashes(size) for size in sizes]
+
+    # The digests recorded in the git-annex keys are used without reading the files
+    known_digests = [all_digests(key.digest_of, algorithms) if key is not None and has_digest else None
+                     for key, has_digest in zip(keys, hashed)]
+
+    # The digests of unchanged files are taken from the previous conversion or the hash cache instead of reading the files again
+    previous_nodes = [None] * len(paths)
+    # The header of a file whose content isn't present can't be read
+    read_header = [detect and is_present for detect, is_present in zip(detect_format, present)]
+    if hash_cache is not None or previous_conversion is not None:
+        for index, (path, file_stat) in enumerate(zip(paths, files_stat)):
+            if previous_conversion is not None:
+                previous_node = previous_conversion.get(path, file_stat)
+                previous_digests = all_digests(partial(previous_digest, previous_node), algorithms) \
+                    if previous_node is not None else None
+                if previous_node is not None and (not hashed[index] or previous_digests is not None):
+                    previous_nodes[index] = previous_node
+                    if hashed[index]:
+                        known_digests[index] = previous_digests
+                    # The format of an unchanged file is known, its header doesn't need to be read again
+                    read_header[index] = False
+            if hashed[index] and known_digests[index] is None and hash_cache is not None:
+                known_digests[index] = all_digests(partial(hash_cache.get, path, file_stat), algorithms)
+
+    # The digests recorded in checksum manifests are used for the remaining files, a sample of them is checked
+    # by hashing these files again, a mismatch meaning that the manifests are out of date
+    verified_digests = {}
+    if checksum_manifest is not None:
+        manifest_indices = []
+        for index, path in enumerate(paths):
+            if hashed[index] and known_digests[index] is None:
+                known_digests[index] = all_digests(partial(checksum_manifest.get, path), algorithms)
+                if known_digests[index] is not None and present[index]:
+                    manifest_indices.append(index)
+        for index in random.sample(manifest_indices, min(verify_checksums, len(manifest_indices))):
+            verified_digests[index] = known_digests[index]
+            known_digests[index] = None
+
+    compute_digest = [has_digest and digest is None and is_present
+                      for has_digest, digest, is_present in zip(hashed, known_digests, present)]
+
+    # The paths of the same physical file (hardlinks, bind mounts) are only read once, through the first of them.
+    # The stats of the scan have no inode on Windows, where these paths are read separately
+    duplicates = {}
+    first_paths = {}
+    for index, file_stat in enumerate(files_stat):
+        if compute_digest[index] and file_stat.st_ino:
+            first = first_paths.setdefault((file_stat.st_dev, file_stat.st_ino), index)
+            if first != index:
+                compute_digest[index] = False
+                # The format detected from the header of the first path holds for the paths with the same extension
+                shares_header = extensions[index] == extensions[first]
+                if shares_header:
+                    read_header[index] = False
+                duplicates[index] = (first, shares_header)
+    read_sizes = [hash_policy.read_size(size) if read else 0 for size, read in zip(sizes, compute_digest)]
+    not_hashed = [path for path, has_digest, digest, is_present in zip(paths, hashed, known_digests, present)
+                  if has_digest and digest is None and not is_present]
+    if not_hashed:
+        warn(f"The content of {len(not_hashed)} annexed files is not present and their digests are not in their "
+             f"git-annex key, they were not hashed (e.g. {not_hashed[0]}). Run 'datalad get' to hash them.")
+    with profiler.stage("hash"):
+        if progress is not None:
+            progress.start("hash", files_total=len(paths),
+                           bytes_total=sum(read_sizes))
+        if io_concurrency:
+            probes = pipeline.probe_files(paths, read_header, extensions, compute_digest, io_concurrency,
+                                          sizes=read_sizes, progress=progress, fingerprint=fingerprint,
+                                          algorithms=algorithms)
+        else:
+            probes = probe_files(paths, read_header, extensions, compute_digest, jobs=jobs, sizes=read_sizes,
+                                 progress=progress, fingerprint=fingerprint, algorithms=algorithms)
+        if progress is not None:
+            progress.finish()
+        profiler.add(files=sum(compute_digest), bytes_read=sum(read_sizes))
+
+    for index, (first, shares_header) in duplicates.items():
+        digests, detected_format = probes[first]
+        probes[index] = (digests, detected_format if shares_header else probes[index][1])
+
+    for index, digests in verified_digests.items():
+        if probes[index][0] != digests:
+            raise ValueError(
+                f"The digests of {paths[index]} don't match the ones of the checksum manifest, which may be out of date.")
+
+    # The paths of the same physical file share its Hash nodes
+    shared_hashes = {first: None for first, _ in duplicates.values()}
+    # A streaming collection writes the files as they are added, they aren't kept in memory
+    keep_files = omcore.File not in getattr(collection, "streamed_types", ())
     files_list = []
-    for index, file in layout_df.iterrows():
-        file_format = None
-        content_description = None
-        data_types = None
-        extension = file["extension"]
-        path = file["path"]
-        iri = IRI(pathlib.Path(path).absolute().as_uri())
-        name = os.path.basename(path)
-        hashes = file_hash(path)
-        storage_size_obj, file_size = file_storage_size(path)
-        if pd.isna(file["subject"]):
-            if file["suffix"] == "participants":
-                if extension == ".json":
-                    content_description = f"A JSON metadata file of participants TSV."
-                    data_types = controlled_terms.DataType.by_name(
-                        "associative array")
-                    file_format = omcore.ContentType.by_name(
-                        "application/json")
-                elif extension == [".tsv"]:
-                    content_description = f"A metadata table for participants."
-                    data_types = controlled_terms.DataType.by_name("table")
-                    file_format = omcore.ContentType.by_name(
-                        "text/tab-separated-values")
+    for index, (path, detect, content_description, data_type, file_format, (digests, detected_format), known_digest, previous_node, file_stat, size) in enumerate(zip(paths, detect_format, content_descriptions, data_types, file_formats, probes, known_digests, previous_nodes, files_stat, sizes)):
+        if known_digest is not None:
+            digests = known_digest
+        elif hash_cache is not None and digests is not None:
+            for algorithm, digest in zip(algorithms, digests):
+                hash_cache.set(path, file_stat, digest, algorithm)
+
+        if index in duplicates:
+            hashes = shared_hashes[duplicates[index][0]]
+            hashes = list(hashes) if hashes is not None else None
         else:
-            if extension == ".json":
-                content_description = f"A JSON metadata file for {file['suffix']} of subject {file['subject']}"
-                data_types = controlled_terms.DataType.by_name(
-                    "associative array")
-                file_format = omcore.ContentType.by_name("application/json")
-            elif extension in [".nii", ".nii.gz"]:
-                content_description = f"Data file for {file['suffix']} of subject {file['subject']}"
-                data_types = controlled_terms.DataType.by_name("voxel data")
-                file_format = detect_nifti_version(path, extension, file_size)
-            elif extension == [".tsv"]:
-                if file["suffix"] == "events":
-                    content_description = f"Event file for {file['suffix']} of subject {file['subject']}"
-                    data_types = controlled_terms.DataType.by_name(
-                        "event sequence")
-                    file_format = omcore.ContentType.by_name(
-                        "text/tab-separated-values")
+            hashes = [omcore.Hash(algorithm=algorithm, digest=digest)
+                      for algorithm, digest in zip(algorithms, digests)] if digests is not None else None
+            if index in shared_hashes:
+                shared_hashes[index] = hashes
+
+        if detect:
+            if previous_node is not None:
+                file_format = content_type_by_id(
+                    previous_format_id(previous_node))
+            elif detected_format is not None:
+                file_format = resolver.controlled_term("ContentType", detected_format)
 
         file = omcore.File(
-            iri=iri,
+            iri=IRI(pathlib.Path(path).absolute().as_uri()),
             content_description=content_description,
-            data_types=data_types,
+            data_types=data_type,
             file_repository=file_repository,
             format=file_format,
             hashes=hashes,
             is_part_of=file2file_bundle_dic[str(
                 pathlib.Path(path))],
-            name=name,
+            name=os.path.basename(path),
             # special_usage_role
-            storage_size=storage_size_obj,
+            storage_size=storage_size_openminds(size),
         )
         collection.add(file)
-        files_list.append(file)
+        if keep_files:
+            files_list.append(file)
 
     return files_list, file_repository
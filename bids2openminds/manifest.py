@@ -0,0 +1,114 @@
+import glob
+import os
+import re
+from urllib.parse import unquote
+
+from .hashing import algorithm_name
+
+# The algorithm of a manifest is taken from its name, e.g. MD5SUMS, manifest-sha256.txt or data.sha1
+MANIFEST_ALGORITHM_PATTERN = re.compile(r"sha3[-_]\d+|sha\d+|md5|blake2[bs]", re.IGNORECASE)
+# Otherwise from the length of each digest in hexadecimal digits
+DIGEST_LENGTH_ALGORITHMS = {32: "MD5", 40: "SHA1", 56: "SHA224", 64: "SHA256", 96: "SHA384", 128: "SHA512"}
+
+# "DIGEST  PATH" as written by md5sum and sha256sum ("*" marking binary mode), or "DIGEST PATH" in BagIt
+SUM_LINE_PATTERN = re.compile(r"(?P<digest>[0-9a-fA-F]+)[ \t]+\*?(?P<path>.+)")
+# "MD5 (PATH) = DIGEST" as written by the BSD tools and with --tag
+TAG_LINE_PATTERN = re.compile(r"(?P<algorithm>[A-Za-z0-9_-]+) ?\((?P<path>.+)\) ?= ?(?P<digest>[0-9a-fA-F]+)")
+BAGIT_MANIFEST_PATTERN = re.compile(r"(tag)?manifest-[A-Za-z0-9_-]+\.txt")
+
+
+def manifest_algorithm(name: str):
+    """The recorded name of an algorithm given in a manifest, e.g. "SHA3_256" for "sha3-256"."""
+    return algorithm_name(name).replace("-", "_")
+
+
+def unescape_sum_path(path: str):
+    # md5sum escapes the backslashes and newlines of the paths, marking the line with a leading backslash
+    return re.sub(r"\\(.)", lambda match: {"n": "\n", "r": "\r"}.get(match.group(1), match.group(1)), path)
+
+
+def normalize_path(path: str):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ChecksumManifest:
+    """
+    The digests recorded in checksum manifests, so that the files they list don't need to be read
+    to be hashed. The manifests can be written by md5sum, sha256sum and similar tools (e.g. MD5SUMS,
+    SHA256SUMS or data.md5, also in their BSD "MD5 (path) = digest" format) or be the payload
+    manifests of a BagIt bag (manifest-sha256.txt). The paths they list are relative to the directory
+    of the manifest.
+
+    The digests are trusted as long as the files keep their path: the manifests should be written
+    after the last change to the dataset. A sample of them can be checked with `verify_checksums`.
+
+    Parameters:
+    - paths (str or list): The manifests, or BagIt bag directories whose manifest-*.txt files are all read.
+
+    Example:
+    >>> manifest = ChecksumManifest(["/archive/ds001/MD5SUMS", "/archive/ds001-bag"])
+    >>> digest = manifest.get(file_path, "MD5")
+    """
+
+    def __init__(self, paths):
+        self.digests = {}
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        for path in paths:
+            if os.path.isdir(path):
+                manifest_paths = sorted(glob.glob(os.path.join(glob.escape(str(path)), "manifest-*.txt")))
+                if not manifest_paths:
+                    raise ValueError(
+                        f"The checksum manifest must be a file or a BagIt bag directory, {path} doesn't contain any manifest-*.txt file.")
+            else:
+                manifest_paths = [path]
+            for manifest_path in manifest_paths:
+                self.load(manifest_path)
+
+    def __len__(self):
+        return len(self.digests)
+
+    def load(self, manifest_path: str):
+        """Adds the digests of a manifest."""
+        name = os.path.basename(manifest_path)
+        match = MANIFEST_ALGORITHM_PATTERN.search(name)
+        default_algorithm = manifest_algorithm(match.group(0)) if match is not None else None
+        bagit = BAGIT_MANIFEST_PATTERN.fullmatch(name) is not None
+        directory = os.path.dirname(os.path.abspath(manifest_path))
+
+        with open(manifest_path, encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                line = line.rstrip("\r\n")
+                if not line.strip() or line.startswith("#"):
+                    continue
+                escaped = not bagit and line.startswith("\\")
+                if escaped:
+                    line = line[1:]
+                tag_match = TAG_LINE_PATTERN.fullmatch(line)
+                sum_match = SUM_LINE_PATTERN.fullmatch(line) if tag_match is None else None
+                if tag_match is not None:
+                    algorithm = manifest_algorithm(tag_match.group("algorithm"))
+                    digest, path = tag_match.group("digest"), tag_match.group("path")
+                elif sum_match is not None:
+                    digest, path = sum_match.group("digest"), sum_match.group("path")
+                    algorithm = default_algorithm or DIGEST_LENGTH_ALGORITHMS.get(len(digest))
+                else:
+                    algorithm = None
+                if algorithm is None:
+                    raise ValueError(
+                        f"The line {line_number} of the checksum manifest {manifest_path} is not a digest of a known algorithm followed by a path.")
+
+                # BagIt percent-encodes the line breaks and percent signs of the paths
+                if bagit:
+                    path = unquote(path)
+                elif escaped:
+                    path = unescape_sum_path(path)
+                key = (normalize_path(os.path.join(directory, path)), algorithm)
+                digest = digest.lower()
+                if self.digests.setdefault(key, digest) != digest:
+                    raise ValueError(
+                        f"The checksum manifests record different {algorithm} digests for {key[0]}.")
+
+    def get(self, file_path: str, algorithm: str = "MD5"):
+        """Returns the recorded digest of a file, or None if no manifest records it for this algorithm."""
+        return self.digests.get((normalize_path(file_path), algorithm))
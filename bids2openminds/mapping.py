@@ -125,6 +125,43 @@ MAP_2_TECHNIQUES = {
     "motion": None, #TODO instance TBD
 }
 
+# (has subject, extension, suffix) -> description of the file, a suffix of None matches any suffix
+# "{suffix}" and "{subject}" in the content description are replaced by the entities of the file
+MAP_2_FILE_DESCRIPTIONS = {
+    (False, ".json", "participants"): {
+        "content_description": "A JSON metadata file of participants TSV.",
+        "data_type": "associative array",
+        "format": "application/json"
+    },
+    (False, ".tsv", "participants"): {
+        "content_description": "A metadata table for participants.",
+        "data_type": "table",
+        "format": "text/tab-separated-values"
+    },
+    (True, ".json", None): {
+        "content_description": "A JSON metadata file for {suffix} of subject {subject}",
+        "data_type": "associative array",
+        "format": "application/json"
+    },
+    (True, ".nii", None): {
+        "content_description": "Data file for {suffix} of subject {subject}",
+        "data_type": "voxel data",
+        "format": None,
+        "detect_format": True
+    },
+    (True, ".nii.gz", None): {
+        "content_description": "Data file for {suffix} of subject {subject}",
+        "data_type": "voxel data",
+        "format": None,
+        "detect_format": True
+    },
+    (True, ".tsv", "events"): {
+        "content_description": "Event file for {suffix} of subject {subject}",
+        "data_type": "event sequence",
+        "format": "text/tab-separated-values"
+    }
+}
+
 MAP_2_UNITS = {
     "year": ["year"]
 }
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .utility import probe_file
+
+
+def run(coroutine):
+    """
+    Runs a coroutine to completion and returns its result, in a separate thread if the calling
+    thread already runs an event loop (e.g. in a notebook), where `asyncio.run` can't be used.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+async def map_bounded(function, items, concurrency, on_done=None):
+    """
+    Awaits `function(*item)` for every item, with at most `concurrency` of them in flight, and
+    returns the results in the order of `items`. `on_done` is called with the index of each item
+    as soon as it completes.
+    """
+    results = [None] * len(items)
+    indices = iter(range(len(items)))
+
+    # Each worker takes the next item as soon as it is done with the previous one, so that
+    # a slow file doesn't hold the others back and only `concurrency` coroutines exist at a time
+    async def worker():
+        for index in indices:
+            results[index] = await function(*items[index])
+            if on_done is not None:
+                on_done(index)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(items)))))
+    return results
+
+
+async def probe_files_async(paths, detect_format, extensions, compute_digest, concurrency, sizes=None,
+                            progress=None, fingerprint=False, algorithms=("MD5",)):
+    loop = asyncio.get_running_loop()
+    probe = partial(probe_file, fingerprint=fingerprint, algorithms=algorithms)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def probe_async(*arguments):
+            return await loop.run_in_executor(executor, probe, *arguments)
+
+        # The callbacks run in the thread of the event loop, so progress is never updated concurrently
+        def advance(index):
+            progress.advance(files=1, bytes_done=sizes[index])
+
+        return await map_bounded(probe_async, list(zip(paths, detect_format, extensions, compute_digest)), concurrency,
+                                 advance if progress is not None else None)
+
+
+def probe_files(paths, detect_format, extensions, compute_digest, concurrency, sizes=None, progress=None,
+                fingerprint=False, algorithms=("MD5",)):
+    """
+    Does the same as `main.probe_files` with an asyncio pipeline for high-latency storage: up
+    to `concurrency` files are probed at the same time, the blocking reads running in worker
+    threads, so that the waits of the storage overlap. The results are returned in the order
+    of `paths`.
+
+    Parameters:
+    - paths (list): The paths of the files.
+    - detect_format (list): Whether to detect the format of each file from its header.
+    - extensions (list): The extension of each file.
+    - compute_digest (list): Whether to hash each file.
+    - concurrency (int): The maximum number of files probed at the same time.
+    - sizes (list, optional): The number of bytes read from each file, reported to `progress`.
+    - progress (Progress, optional): Tracks the probed files.
+    - fingerprint (bool, optional): Whether the digests are fingerprints instead of hashes of the whole files. Default is False.
+    - algorithms (iterable, optional): The hashing algorithms whose digests are computed. Default is ("MD5",).
+
+    Returns:
+    - list: (tuple of the digests or None, name of the detected ContentType or None) of each file.
+    """
+    if concurrency < 1:
+        raise ValueError(
+            f"The I/O concurrency must be a positive number of files, you have specified {concurrency}.")
+    return run(probe_files_async(paths, detect_format, extensions, compute_digest, concurrency, sizes, progress,
+                                 fingerprint, algorithms))
+
+
+def stat_files(paths, concurrency):
+    """Returns the `os.stat_result` of each path, with up to `concurrency` stat calls in flight."""
+    async def stat_all():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            async def stat(path):
+                return await loop.run_in_executor(executor, os.stat, path)
+            return await map_bounded(stat, [(path,) for path in paths], concurrency)
+
+    if concurrency < 1:
+        raise ValueError(
+            f"The I/O concurrency must be a positive number of files, you have specified {concurrency}.")
+    return run(stat_all())
@@ -0,0 +1,86 @@
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where the peak memory isn't recorded
+    resource = None
+
+
+def process_peak_rss():
+    """
+    Returns the peak resident memory of the whole process since it started, in bytes, or None if
+    it is not available. It never decreases, so it includes whatever ran before the conversion.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Profiler:
+    """
+    Records the wall time, CPU time, peak memory, number of files and bytes read of the stages
+    of a conversion. Stages can be nested, the counts added with `add` go to the innermost one.
+
+    The peak resident memory (process_peak_rss) is the peak of the whole process, since it started,
+    up to the end of the stage: a stage only raises it if it uses more memory than all before it. When
+    tracemalloc is tracing, e.g. with `python -X tracemalloc`, the peak of the memory allocated
+    by Python during the stage is also recorded.
+
+    Example:
+    >>> profiler = Profiler()
+    >>> with profiler.stage("create_file"):
+    ...     profiler.add(files=10, bytes_read=4096)
+    >>> profiler.to_dict()["stages"][0]["files"]
+    10
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._active = []
+        self._start = (time.perf_counter(), time.process_time())
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Context manager recording a stage."""
+        record = {"name": name, "files": None, "bytes_read": None}
+        (self._active[-1].setdefault("stages", []) if self._active else self.stages).append(record)
+        self._active.append(record)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - wall_start
+            record["cpu_time"] = time.process_time() - cpu_start
+            record["process_peak_rss"] = process_peak_rss()
+            record["peak_traced"] = tracemalloc.get_traced_memory()[1] if tracing else None
+            self._active.pop()
+
+    def add(self, **counts):
+        """Adds counts, such as `files` or `bytes_read`, to the innermost active stage."""
+        if not self._active:
+            return
+        record = self._active[-1]
+        for name, count in counts.items():
+            record[name] = (record.get(name) or 0) + count
+
+    def to_dict(self):
+        """
+        Returns the profile as a dictionary, with the list of "stages", the "wall_time" and "cpu_time"
+        of the whole conversion in seconds and the "process_peak_rss" in bytes.
+        """
+        wall_start, cpu_start = self._start
+        return {"wall_time": time.perf_counter() - wall_start,
+                "cpu_time": time.process_time() - cpu_start,
+                "process_peak_rss": process_peak_rss(),
+                "cpu_count": os.cpu_count(),
+                "stages": self.stages}
@@ -0,0 +1,106 @@
+import sys
+import time
+from collections import namedtuple
+
+# The state of a phase of the conversion, as passed to the progress callbacks:
+# - phase (str): "scan" while the tree is listed, counting the size of the files found, and
+#   "hash" while the files are read and hashed, counting the bytes read.
+# - files_done, files_total (int): The number of files processed, and to process if known (else None).
+# - bytes_done, bytes_total (int): The number of bytes found or read, and to read if known (else None).
+# - rate (float): The current throughput in bytes per second.
+# - eta (float): The estimated number of seconds left, None if unknown.
+# - finished (bool): Whether the phase is complete, the last event of each phase.
+ProgressEvent = namedtuple("ProgressEvent", ["phase", "files_done", "files_total", "bytes_done", "bytes_total",
+                                             "rate", "eta", "finished"])
+
+
+class Progress:
+    """
+    Tracks the progress of the phases of a conversion and reports it to a callback, at most
+    once every `interval` seconds and at the end of each phase, so that updating it for every
+    file costs almost nothing.
+
+    Parameters:
+    - callback (callable): Called with a ProgressEvent.
+    - interval (float, optional): The minimum number of seconds between two events of a phase. Default is 0.5.
+
+    Example:
+    >>> progress = Progress(print_progress)
+    >>> progress.start("hash", files_total=len(paths), bytes_total=total_size)
+    >>> progress.advance(files=1, bytes_done=file_size)
+    >>> progress.finish()
+    """
+
+    def __init__(self, callback, interval: float = 0.5):
+        self.callback = callback
+        self.interval = interval
+        self.start(None)
+
+    def start(self, phase: str, files_total: int = None, bytes_total: int = None):
+        """Starts a new phase."""
+        self.phase = phase
+        self.files_done = 0
+        self.files_total = files_total
+        self.bytes_done = 0
+        self.bytes_total = bytes_total
+        self._start_time = self._last_time = time.monotonic()
+        self._last_bytes = 0
+
+    def advance(self, files: int = 1, bytes_done: int = 0):
+        """Records processed files and read bytes, reporting them if the last event is old enough."""
+        self.files_done += files
+        self.bytes_done += bytes_done
+        now = time.monotonic()
+        if now - self._last_time >= self.interval:
+            self._report(now, finished=False)
+
+    def finish(self):
+        """Ends the current phase, with a last event."""
+        self._report(time.monotonic(), finished=True)
+
+    def _report(self, now, finished):
+        elapsed = now - self._last_time
+        if finished:
+            # The rate of the whole phase is more meaningful for its last event
+            elapsed, bytes_read = now - self._start_time, self.bytes_done
+        else:
+            bytes_read = self.bytes_done - self._last_bytes
+        rate = bytes_read / elapsed if elapsed > 0 else 0.0
+
+        # The estimate uses the average rate of the phase, which is steadier than the current one
+        eta = None
+        average_time = now - self._start_time
+        if finished:
+            eta = 0.0
+        elif self.bytes_total and self.bytes_done:
+            eta = (self.bytes_total - self.bytes_done) * average_time / self.bytes_done
+        elif self.files_total and self.files_done:
+            eta = (self.files_total - self.files_done) * average_time / self.files_done
+
+        self._last_time, self._last_bytes = now, self.bytes_done
+        self.callback(ProgressEvent(self.phase, self.files_done, self.files_total, self.bytes_done,
+                                    self.bytes_total, rate, eta, finished))
+
+
+def format_size(size: float):
+    """Formats a number of bytes with a binary unit, e.g. "1.5 GiB"."""
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if abs(size) < 1024 or unit == "TiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+
+
+def print_progress(event: ProgressEvent, stream=None):
+    """Displays a progress event on a single line of the terminal, standard error by default."""
+    stream = stream or sys.stderr
+    files = f"{event.files_done}/{event.files_total}" if event.files_total is not None else str(event.files_done)
+    line = f"{event.phase}: {files} files, {format_size(event.bytes_done)}"
+    # The throughput is only meaningful for the phases reading the files, whose total size is known
+    if event.bytes_total is not None:
+        line += f"/{format_size(event.bytes_total)}, {format_size(event.rate)}/s"
+    if event.eta is not None and not event.finished:
+        minutes, seconds = divmod(int(event.eta), 60)
+        line += f", ETA {minutes // 60}:{minutes % 60:02d}:{seconds:02d}"
+    # The line is overwritten by the next event of the phase, and kept once it is finished
+    stream.write("\r" + line.ljust(79) + ("\n" if event.finished else ""))
+    stream.flush()
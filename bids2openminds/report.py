@@ -1,7 +1,7 @@
 import os
 
 
-def create_report(dataset, dataset_version, collection, dataset_description, input_path, output_path):
+def create_report(dataset, dataset_version, collection, dataset_description, input_path, output_path, previous_conversion=None):
     subject_number = 0
     subject_state_numbers = []
     file_bundle_number = 0
@@ -26,6 +26,11 @@ def create_report(dataset, dataset_version, collection, dataset_description, inp
 
             behavioral_protocols_numbers += 1
 
+    # The nodes written by a streaming collection are no longer in it
+    for type_, count in getattr(collection, "streamed", {}).items():
+        if type_.endswith("File"):
+            files_number += count
+
     experimental_approaches_list = ""
     if dataset_version.experimental_approaches is not None:
         for approache in dataset_version.experimental_approaches:
@@ -113,4 +118,8 @@ Behavioral protocols:
     if os.path.isdir(derivatives_path):
         report = report+"+ Dataset contains derivative, derivative data are ignored for now\n"
 
+    if previous_conversion is not None:
+        report = report + \
+            f"+ Incremental conversion: {previous_conversion.reused} unchanged files reused, {previous_conversion.changed} new or changed files, {previous_conversion.removed} removed files\n"
+
     return report
@@ -0,0 +1,102 @@
+from functools import lru_cache
+
+import openminds.v3.controlled_terms as controlled_terms
+import openminds.v3.core as omcore
+
+from . import mapping
+
+# The controlled term types searched, in order, for the names in mapping.MAP_2_TECHNIQUES
+TECHNIQUE_TYPES = ("Technique", "AnalysisTechnique", "StimulationApproach",
+                   "StimulationTechnique")
+
+
+@lru_cache(maxsize=None)
+def controlled_term(type_name: str, name: str):
+    """
+    Returns the openMINDS instance of the given type with the given name, or None if there is none.
+    The lookups are memoized, so each name is only searched once.
+
+    Parameters:
+    - type_name (str): The name of the openMINDS type, e.g. "DataType" or "ContentType".
+    - name (str): The name of the instance, as accepted by `by_name`.
+
+    Example:
+    >>> controlled_term("UnitOfMeasurement", "byte").name
+    'byte'
+    """
+    openminds_type = getattr(controlled_terms, type_name, None) or getattr(
+        omcore, type_name)
+    try:
+        # Depending on the version of openminds, unknown names raise a KeyError or return None
+        return openminds_type.by_name(name)
+    except KeyError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def content_type_by_id(content_type_id: str):
+    """Returns the openMINDS ContentType with the given identifier, or None."""
+    if content_type_id is None:
+        return None
+    for content_type in omcore.ContentType.instances():
+        if content_type.id == content_type_id:
+            return content_type
+    return None
+
+
+def _resolve_table(bids_map, type_names):
+    # Resolves every name of a mapping table once, keeping the names that could not be found apart
+    resolved = {}
+    unresolved = {}
+    for bids_name, names in bids_map.items():
+        resolved[bids_name] = []
+        for name in names or []:
+            for type_name in type_names:
+                instance = controlled_term(type_name, name)
+                if instance is not None:
+                    resolved[bids_name].append(instance)
+                    break
+            else:
+                unresolved.setdefault(bids_name, []).append(name)
+    return resolved, unresolved
+
+
+@lru_cache(maxsize=None)
+def technique_table():
+    """
+    Resolves `mapping.MAP_2_TECHNIQUES` into openMINDS instances, on first use.
+
+    Returns:
+    - tuple: (dict of BIDS suffix -> list of techniques, dict of BIDS suffix -> list of names that could not be resolved)
+    """
+    return _resolve_table(mapping.MAP_2_TECHNIQUES, TECHNIQUE_TYPES)
+
+
+@lru_cache(maxsize=None)
+def approach_table():
+    """
+    Resolves `mapping.MAP_2_EXPERIMENTAL_APPROACHES` into openMINDS instances, on first use.
+
+    Returns:
+    - tuple: (dict of BIDS datatype -> list of experimental approaches, dict of BIDS datatype -> list of names that could not be resolved)
+    """
+    return _resolve_table(mapping.MAP_2_EXPERIMENTAL_APPROACHES, ("ExperimentalApproach",))
+
+
+def techniques(suffix: str):
+    """Returns the list of openMINDS techniques of a BIDS suffix."""
+    return list(technique_table()[0].get(suffix, []))
+
+
+def approaches(datatype: str):
+    """Returns the list of openMINDS experimental approaches of a BIDS datatype."""
+    return list(approach_table()[0].get(datatype, []))
+
+
+def unresolved_terms():
+    """
+    Returns the names of the mapping tables that could not be found in openMINDS, as a dictionary
+    with the keys "techniques" and "experimental approaches".
+    """
+    return {"techniques": technique_table()[1],
+            "experimental approaches": approach_table()[1]}
@@ -0,0 +1,155 @@
+import json
+import os
+from collections import Counter
+
+from openminds import Collection
+from openminds.base import LinkedNodeEmbedding
+import openminds.v3.core as omcore
+
+
+class StreamingCollection(Collection):
+    """
+    An openMINDS collection writing some of its nodes to the output as soon as they are added,
+    instead of keeping them in memory until the collection is saved. The other nodes, which are
+    referenced across the graph (dataset, subjects, file bundles...), are kept and written by `save`.
+
+    The output is the same as the one of `Collection.save`, except for the order of the nodes.
+    With a single output file, the nodes are written to "<path>.part", which is renamed to `path`
+    once the collection is saved.
+
+    Parameters:
+    - path (str): The output file, or directory if `individual_files` is True.
+    - individual_files (bool, optional): Whether each node is saved into a separate file. Default is False.
+    - include_empty_properties (bool, optional): Whether to include the properties with value None. Default is False.
+    - streamed_types (tuple, optional): The openMINDS types written as soon as they are added. Default is (File,).
+      Their nodes must be complete when they are added to the collection.
+
+    Example:
+    >>> collection = StreamingCollection("openminds.jsonld")
+    >>> collection.add(file)  # written to openminds.jsonld.part
+    >>> collection.save("openminds.jsonld")
+    """
+
+    def __init__(self, path: str, individual_files: bool = False, include_empty_properties: bool = False,
+                 streamed_types=(omcore.File,)):
+        self.path = path
+        self.individual_files = individual_files
+        self.include_empty_properties = include_empty_properties
+        self.streamed_types = streamed_types
+        # Number of written nodes of each type
+        self.streamed = Counter()
+        self._streamed_failures = {}
+        self._output = None
+        self._graph_end = None
+        super().__init__()
+
+    def _add_node(self, node):
+        # Nodes that already have an identifier were either streamed already or are kept in memory
+        if node.id is not None or not isinstance(node, self.streamed_types):
+            return super()._add_node(node)
+
+        node.id = self._get_blank_node_identifier()
+        self.streamed[node.type_] += 1
+        for linked_node in node.links:
+            self._add_node(linked_node)
+        failures = node.validate()
+        if failures:
+            self._streamed_failures[node.id] = failures
+        self._write_node(node)
+
+    def _get_blank_node_identifier(self):
+        # The written nodes are counted so that the identifiers are the same as in an in-memory collection
+        return f"_:{len(self.nodes) + sum(self.streamed.values()):06d}"
+
+    def _write_node(self, node):
+        if self.individual_files:
+            if self._output is None:
+                os.makedirs(self.path, exist_ok=True)
+                if not os.path.isdir(self.path):
+                    raise OSError(
+                        f"If saving to multiple files, `path` must be a directory. path={self.path}")
+                self._output = self.path
+            with open(os.path.join(self.path, f"{node.id[2:]}.jsonld"), "w") as file:
+                json.dump(node.to_jsonld(embed_linked_nodes=LinkedNodeEmbedding.NEVER,
+                                         include_empty_properties=self.include_empty_properties), file, indent=2)
+            return
+
+        self._write_graph_item(node.type_, node.to_jsonld(embed_linked_nodes=LinkedNodeEmbedding.NEVER,
+                                                          include_empty_properties=self.include_empty_properties,
+                                                          with_context=False))
+
+    def _write_graph_item(self, type_, data):
+        if self._output is None:
+            self._open_graph(type_)
+        else:
+            self._output.write(",")
+        # Indented as an item of the "@graph" list, as written by json.dump
+        self._output.write("\n    " + json.dumps(data, indent=2).replace("\n", "\n    "))
+
+    def _open_graph(self, type_):
+        if os.path.isdir(self.path):
+            raise OSError(
+                f"Cannot create file {self.path} because a directory with that name already exists.")
+        parent_dir = os.path.dirname(self.path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        if type_.startswith("https://openminds.ebrains.eu/"):
+            data_context = {"@vocab": "https://openminds.ebrains.eu/vocab/"}
+        else:
+            data_context = {"@vocab": "https://openminds.om-i.org/props/"}
+        graph_start, self._graph_end = json.dumps(
+            {"@context": data_context, "@graph": []}, indent=2).split("[]")
+        self._output = open(self.path + ".part", "w")
+        self._output.write(graph_start + "[")
+
+    def validate(self, ignore=None):
+        """
+        Checks the constraints of the nodes kept in the collection and of the written nodes.
+        Returns a dict containing information about any validation failures.
+        """
+        all_failures = super().validate(ignore=ignore)
+        for node_id, failures in self._streamed_failures.items():
+            failures = {check: messages for check, messages in failures.items()
+                        if check not in (ignore or [])}
+            if failures:
+                all_failures[node_id] = failures
+        return all_failures
+
+    def save(self, path: str, individual_files: bool = False, include_empty_properties: bool = False):
+        """
+        Writes the nodes kept in the collection and completes the output.
+        The arguments must be the ones the collection was created with.
+
+        The kept nodes are saved by `Collection.save`: directly in the output directory with
+        `individual_files`, or otherwise to "<path>.kept", whose graph is appended to the written nodes.
+
+        Returns:
+        - list: The paths of the files written by `save`.
+        """
+        if (path, individual_files, include_empty_properties) != (self.path, self.individual_files,
+                                                                  self.include_empty_properties):
+            raise ValueError(
+                "A streaming collection can only be saved to the output it was created with.")
+
+        # The nodes linked after their parent was added, which Collection.save adds, are kept as the others
+        streamed_types, self.streamed_types = self.streamed_types, ()
+        try:
+            if individual_files or self._output is None:
+                return super().save(path, individual_files=individual_files,
+                                    include_empty_properties=include_empty_properties)
+
+            kept_path = path + ".kept"
+            super().save(kept_path, include_empty_properties=include_empty_properties)
+        finally:
+            self.streamed_types = streamed_types
+        with open(kept_path) as file:
+            kept_graph = json.load(file)["@graph"]
+        os.remove(kept_path)
+        for data in kept_graph:
+            self._write_graph_item(data["@type"], data)
+
+        self._output.write("\n  ]" + self._graph_end)
+        self._output.close()
+        self._output = None
+        os.replace(path + ".part", path)
+        return [path]
@@ -1,5 +1,6 @@
 import hashlib
 import json
+import mmap
 import os
 import re
 import gzip
@@ -7,9 +8,21 @@ from warnings import warn
 
 import pandas as pd
 
-import openminds.v3.controlled_terms as controlled_terms
-from openminds.v3.core import Hash, QuantitativeValue, ContentType
-from openminds.v3.controlled_terms import UnitOfMeasurement
+from openminds.v3.core import Hash, QuantitativeValue
+
+from .resolver import controlled_term
+from .headers import HeaderReader, header_detector, nifti_version
+from .hash_policy import FINGERPRINT_BLOCK_SIZE
+from .hashing import MultiHash
+
+# Size of the buffer used to stream file contents through the hash functions
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Files at least this large are hashed from a memory mapping instead of being read into a buffer
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Size of the reads of a file whose header is read without hashing it
+HEADER_BUFFER_SIZE = 64 * 1024
 
 
 def read_json(file_path: str) -> dict:
@@ -79,30 +92,146 @@ def pd_table_value(data_frame, column_name, not_list: bool = True):
         return None
 
 
-def file_hash(file_path: str, algorithm: str = "MD5"):
+def advise_sequential(file):
+    """Tells the kernel that a file will be read sequentially, so that it reads ahead more, if supported."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def hash_mapped_file(file, hash_object, chunk_size: int, header_reader: HeaderReader = None):
     """
-    Compute the hash digest of a file using the specified hashing algorithm an returns an openMINDs object.
+    Feeds `hash_object` with the content of a file mapped in memory, which hashes the pages of
+    the file directly instead of copying them to a buffer first.
+
+    Returns:
+    - bool: False if the file couldn't be mapped, e.g. on file systems not supporting it, in which case nothing was hashed.
+    """
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    with mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        # The views of the mapping must all be released before it is closed
+        with memoryview(mapped) as view:
+            for start in range(0, len(view), chunk_size):
+                with view[start:start + chunk_size] as chunk:
+                    hash_object.update(chunk)
+                    if header_reader is not None:
+                        header_reader.feed(chunk)
+    return True
+
+
+def file_digest(file_path: str, algorithm: str = "MD5", buffer_size: int = HASH_BUFFER_SIZE,
+                header_reader: HeaderReader = None, mmap_threshold: int = MMAP_THRESHOLD):
+    """
+    Compute the hexadecimal hash digest of a file using the specified hashing algorithm.
+    See `file_digests` for the parameters.
+
+    Returns:
+    - str: The hexadecimal digest of the file content.
+    """
+    return file_digests(file_path, (algorithm,), buffer_size, header_reader, mmap_threshold)[0]
+
+
+def file_digests(file_path: str, algorithms=("MD5",), buffer_size: int = HASH_BUFFER_SIZE,
+                 header_reader: HeaderReader = None, mmap_threshold: int = MMAP_THRESHOLD):
+    """
+    Compute the hexadecimal hash digests of a file with several hashing algorithms, from a single read of the file.
+
+    The file is streamed through the hash in chunks of `buffer_size` bytes, reusing a single
+    preallocated buffer, so memory usage does not depend on the size of the file. Files of at
+    least `mmap_threshold` bytes are mapped in memory and hashed without copying, falling back
+    to the buffer if they can't be mapped.
 
     Parameters:
     - file_path (str): The path to the file for which you want to compute the hash.
-    - algorithm (str, optional): The hashing algorithm to use. Default is "MD5".
+    - algorithms (iterable, optional): The hashing algorithms to use, among `hashing.available_algorithms()`. Default is ("MD5",).
+    - buffer_size (int, optional): The size in bytes of the read buffer. Default is HASH_BUFFER_SIZE (1 MiB).
+    - header_reader (HeaderReader, optional): Fed with the chunks read, to capture the header of the file in the same pass.
+    - mmap_threshold (int, optional): The size in bytes from which files are memory mapped, None to never map them. Default is MMAP_THRESHOLD (16 MiB).
 
     Returns:
-    - Hash: An openMINDS object representing the computed hash, containing the algorithm and digest.
+    - tuple: The hexadecimal digests of the file content, in the order of `algorithms`.
+    """
+    if buffer_size <= 0:
+        raise ValueError(
+            f"The hash buffer size must be a positive number of bytes, you have specified {buffer_size}.")
+
+    # Create a hash object feeding the data to each of the specified algorithms
+    hash_object = MultiHash(algorithms)
+
+    # Open the file in binary mode, unbuffered as we manage our own buffer
+    with open(file_path, "rb", buffering=0) as file:
+        if mmap_threshold is not None and os.fstat(file.fileno()).st_size >= mmap_threshold and \
+                hash_mapped_file(file, hash_object, buffer_size, header_reader):
+            return hash_object.hexdigests()
+
+        advise_sequential(file)
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while True:
+            # Read the next chunk of the file into the buffer
+            read_size = file.readinto(buffer)
+            if not read_size:
+                break
+            # Update the hash object with the part of the buffer that was filled
+            hash_object.update(view[:read_size])
+            if header_reader is not None:
+                header_reader.feed(view[:read_size])
+
+    # Calculate the hexadecimal digests of the hash
+    return hash_object.hexdigests()
+
+
+def file_fingerprint(file_path: str, block_size: int = FINGERPRINT_BLOCK_SIZE, header_reader: HeaderReader = None):
+    """
+    Computes a cheap, non-standard digest of a file: the MD5 of its size followed by its first and
+    last `block_size` bytes, or by its whole content if it is at most twice as large. It only reads
+    a fixed amount of each file, but doesn't detect changes in the middle of large files.
+
+    Parameters:
+    - file_path (str): The path to the file.
+    - block_size (int, optional): The number of bytes read at the start and at the end of the file. Default is FINGERPRINT_BLOCK_SIZE (64 KiB).
+    - header_reader (HeaderReader, optional): Fed with the start of the file, to capture its header in the same pass.
+
+    Returns:
+    - str: The hexadecimal digest.
     """
-    # Open the file in binary mode
+    hash_object = hashlib.md5()
     with open(file_path, "rb") as file:
-        # Read the content of the file
-        file_content = file.read()
+        size = os.fstat(file.fileno()).st_size
+        hash_object.update(size.to_bytes(8, "little"))
+        if size <= 2 * block_size:
+            blocks = [file.read()]
+        else:
+            head = file.read(block_size)
+            file.seek(-block_size, os.SEEK_END)
+            blocks = [head, file.read(block_size)]
+    for block in blocks:
+        hash_object.update(block)
+    if header_reader is not None:
+        header_reader.feed(blocks[0])
+    return hash_object.hexdigest()
 
-        # Create a new hash object using the specified algorithm
-        hash_object = hashlib.new(algorithm)
 
-        # Update the hash object with the content of the file
-        hash_object.update(file_content)
+def file_hash(file_path: str, algorithm: str = "MD5", buffer_size: int = HASH_BUFFER_SIZE):
+    """
+    Compute the hash digest of a file using the specified hashing algorithm an returns an openMINDs object.
 
-        # Calculate the hexadecimal digest of the hash
-        hash_value = hash_object.hexdigest()
+    Parameters:
+    - file_path (str): The path to the file for which you want to compute the hash.
+    - algorithm (str, optional): The hashing algorithm to use. Default is "MD5".
+    - buffer_size (int, optional): The size in bytes of the read buffer. Default is HASH_BUFFER_SIZE (1 MiB).
+
+    Returns:
+    - Hash: An openMINDS object representing the computed hash, containing the algorithm and digest.
+    """
+    hash_value = file_digest(file_path, algorithm, buffer_size)
 
     # Create a openMINDS Hash object with the algorithm and digest
     openminds_hash = Hash(algorithm=algorithm, digest=hash_value)
@@ -110,68 +239,101 @@ def file_hash(file_path: str, algorithm: str = "MD5"):
     return openminds_hash
 
 
+def storage_size_openminds(size: int):
+    return QuantitativeValue(value=size, unit=controlled_term("UnitOfMeasurement", "byte"))
+
+
 def file_storage_size(file_path: str):
     file_stats = os.stat(file_path)
-    file_size = QuantitativeValue(
-        value=file_stats.st_size, unit=UnitOfMeasurement.by_name("byte"))
+    file_size = storage_size_openminds(file_stats.st_size)
     return file_size, file_stats.st_size
 
 
-def detect_nifti_version(file_name, extension, file_size):
+def read_file_header(file_path: str, header_reader: HeaderReader, buffer_size: int = HEADER_BUFFER_SIZE):
+    """Reads the start of a file into `header_reader`, until it has captured enough bytes."""
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as file:
+        while not header_reader.complete:
+            read_size = file.readinto(buffer)
+            if not read_size:
+                break
+            header_reader.feed(view[:read_size])
 
-    nii1_sizeof_hdr = 348
-    nii2_sizeof_hdr = 540
 
-    if extension == ".nii":
+def read_nifti_version(file_name, extension):
+    """
+    Reads the first four bytes of a NIfTI file (decompressing it for ".nii.gz") and
+    returns the NIfTI version (1 or 2) based on the size of the header, or None if it
+    could not be detected.
+    """
 
+    if extension == ".nii":
         with open(file_name, 'rb') as fp:
             byte_data = fp.read(4)
-
-        sizeof_hdr = int.from_bytes(byte_data, byteorder='little')
-
-        if sizeof_hdr == 0:
-            return None
-
-        if sizeof_hdr == nii1_sizeof_hdr:
-            return ContentType.by_name("application/vnd.nifti.1")
-
-        elif sizeof_hdr == nii2_sizeof_hdr:
-            return ContentType.by_name("application/vnd.nifti.2")
-
-        else:  # big endian
-            sizeof_hdr = int.from_bytes(byte_data, byteorder='big')
-
-            if sizeof_hdr == nii1_sizeof_hdr:
-                return ContentType.by_name("application/vnd.nifti.1")
-
-            elif sizeof_hdr == nii2_sizeof_hdr:
-                return ContentType.by_name("application/vnd.nifti.2")
-
-    if extension == ".nii.gz":
+    elif extension == ".nii.gz":
         try:
             with gzip.open(file_name, 'rb') as fp:
                 byte_data = fp.read(4)
         except gzip.BadGzipFile:
             return None
+    else:
+        return None
 
-        sizeof_hdr = int.from_bytes(byte_data, byteorder='little')
+    return nifti_version(byte_data)
 
-        if sizeof_hdr == 0:
-            return None
 
-        if sizeof_hdr == nii1_sizeof_hdr:
-            return ContentType.by_name("application/vnd.nifti.1")
+def nifti_content_type(nifti_version):
+    if nifti_version == 1:
+        return controlled_term("ContentType", "application/vnd.nifti.1")
+    if nifti_version == 2:
+        return controlled_term("ContentType", "application/vnd.nifti.2")
+    return None
+
 
-        elif sizeof_hdr == nii2_sizeof_hdr:
-            return ContentType.by_name("application/vnd.nifti.2")
+def detect_nifti_version(file_name, extension, file_size):
+    return nifti_content_type(read_nifti_version(file_name, extension))
 
-        else:  # big endian
-            sizeof_hdr = int.from_bytes(byte_data, byteorder='big')
 
-            if sizeof_hdr == nii1_sizeof_hdr:
-                return ContentType.by_name("application/vnd.nifti.1")
+def probe_file(file_path: str, detect_format: bool = False, extension: str = None, compute_digest: bool = True,
+               fingerprint: bool = False, algorithms=("MD5",)):
+    """
+    Performs the per-file I/O needed to describe a file in a single pass: hashing its content
+    and, if requested, detecting its format from its header with the detector registered for
+    its extension in `headers.HEADER_DETECTORS`. The header is captured from the bytes read for
+    the hash, so the file is only opened once; if the digests are already known, only the start of
+    the file is read.
 
-            elif sizeof_hdr == nii2_sizeof_hdr:
-                return ContentType.by_name("application/vnd.nifti.2")
+    Only plain Python values are returned so that the function can safely be run
+    in worker threads; the openMINDS objects are created by the caller.
 
-    return None
+    Parameters:
+    - file_path (str): The path to the file.
+    - detect_format (bool, optional): Whether to read the header of the file to detect its format. Default is False.
+    - extension (str, optional): The extension of the file, selecting the detector of its format.
+    - compute_digest (bool, optional): Whether to hash the content of the file, e.g. False if the digests are already known. Default is True.
+    - fingerprint (bool, optional): Whether the digest is the fingerprint computed by `file_fingerprint` instead of hashes of the whole content. Default is False.
+    - algorithms (iterable, optional): The hashing algorithms whose digests are computed, unless `fingerprint` is set. Default is ("MD5",).
+
+    Returns:
+    - tuple: (tuple of the digests, or of the fingerprint, or None, name of the detected ContentType or None)
+    """
+    if fingerprint:
+        def digest_function(file_path, header_reader=None):
+            return (file_fingerprint(file_path, header_reader=header_reader),)
+    else:
+        def digest_function(file_path, header_reader=None):
+            return file_digests(file_path, algorithms, header_reader=header_reader)
+
+    detector = header_detector(extension) if detect_format else None
+    if detector is None:
+        return (digest_function(file_path) if compute_digest else None), None
+
+    (header_size, detect), compressed = detector
+    header_reader = HeaderReader(header_size, compressed)
+    digests = None
+    if compute_digest:
+        digests = digest_function(file_path, header_reader=header_reader)
+    else:
+        read_file_header(file_path, header_reader)
+    return digests, detect(header_reader.header)
@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+import pytest
+from bids2openminds.annex import AnnexKey, annex_key, parse_annex_key
+from bids2openminds.converter import convert
+
+# A digest which isn't the one of the content, to check that the annexed files are not read
+KEY_DIGEST = "0123456789abcdef0123456789abcdef"
+
+
+@pytest.mark.parametrize("key,expected", [
+    (f"MD5E-s1101--{KEY_DIGEST}.nii.gz", AnnexKey("MD5E", 1101, "MD5", KEY_DIGEST)),
+    (f"MD5-s1101--{KEY_DIGEST}", AnnexKey("MD5", 1101, "MD5", KEY_DIGEST)),
+    ("SHA256E-s5--" + "a" * 64 + ".json", AnnexKey("SHA256E", 5, "SHA256", "a" * 64)),
+    ("BLAKE2B512-s5-S1-C1--" + "b" * 128, AnnexKey("BLAKE2B512", 5, "BLAKE2B", "b" * 128)),
+    ("WORM-s5-m1700000000--sub-01_T1w.nii", AnnexKey("WORM", 5, None, None)),
+    ("URL--https&c%%example.org%data", AnnexKey("URL", None, None, None)),
+    ("sub-01_T1w.nii.gz", None)])
+def test_parse_annex_key(key, expected):
+    assert parse_annex_key(key) == expected
+
+
+def write_annexed_file(dataset_path, relative_path, content, present=True):
+    # Writes a file the way git-annex does: a symbolic link to its content in .git/annex/objects
+    key = f"MD5E-s{len(content)}--{KEY_DIGEST}.nii.gz"
+    object_path = os.path.join(dataset_path, ".git", "annex", "objects", "Ab", "Cd", key, key)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    if present:
+        with open(object_path, "wb") as file:
+            file.write(content)
+    file_path = os.path.join(dataset_path, relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    os.symlink(os.path.relpath(object_path, os.path.dirname(file_path)), file_path)
+    return file_path
+
+
+@pytest.fixture
+def annex_dataset(tmp_path):
+    with open(tmp_path / "dataset_description.json", "w") as file:
+        json.dump({"Name": "Annexed dataset", "BIDSVersion": "1.8.0"}, file)
+    content = gzip.compress((348).to_bytes(4, "little") + bytes(344) + b"n+1\0")
+    write_annexed_file(tmp_path, "sub-01/anat/sub-01_T1w.nii.gz", content)
+    # The content of another key isn't present, as after a `datalad drop`
+    write_annexed_file(tmp_path, "sub-02/anat/sub-02_T1w.nii.gz", content + bytes(10), present=False)
+    return tmp_path, len(content)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="git-annex files are symbolic links")
+def test_annex_key(annex_dataset):
+    dataset_path, size = annex_dataset
+    assert annex_key(str(dataset_path / "sub-01/anat/sub-01_T1w.nii.gz")) == AnnexKey("MD5E", size, "MD5", KEY_DIGEST)
+    # The key of a file whose content isn't present is read from its link
+    assert annex_key(str(dataset_path / "sub-02/anat/sub-02_T1w.nii.gz")) == \
+        AnnexKey("MD5E", size + 10, "MD5", KEY_DIGEST)
+    assert annex_key(str(dataset_path / "dataset_description.json")) is None
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="git-annex files are symbolic links")
+def test_annex_conversion(annex_dataset, tmp_path_factory):
+    dataset_path, size = annex_dataset
+    output_path = tmp_path_factory.mktemp("output") / "openminds.jsonld"
+    with pytest.warns(UserWarning, match="not present"):
+        convert(str(dataset_path), save_output=True, output_path=str(output_path), hash_algorithms="MD5,SHA256")
+    with open(output_path) as file:
+        files = {node["name"]: node for node in json.load(file)["@graph"] if node["@type"].endswith("/File")}
+
+    # Both files get the size of their key, but only the MD5 digest of the key is known without the content
+    assert files["sub-01_T1w.nii.gz"]["storageSize"]["value"] == size
+    assert files["sub-02_T1w.nii.gz"]["storageSize"]["value"] == size + 10
+    digests = {node["algorithm"]: node["digest"] for node in files["sub-01_T1w.nii.gz"]["hash"]}
+    assert set(digests) == {"MD5", "SHA256"} and digests["MD5"] != KEY_DIGEST
+    assert files["sub-02_T1w.nii.gz"].get("hash") is None
+
+    convert(str(dataset_path), save_output=True, output_path=str(output_path), quiet=True)
+    with open(output_path) as file:
+        files = {node["name"]: node for node in json.load(file)["@graph"] if node["@type"].endswith("/File")}
+    for name in ["sub-01_T1w.nii.gz", "sub-02_T1w.nii.gz"]:
+        assert files[name]["hash"] == [{"@type": "https://openminds.ebrains.eu/core/Hash", "algorithm": "MD5",
+                                        "digest": KEY_DIGEST}]
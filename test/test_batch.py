@@ -0,0 +1,84 @@
+import json
+import os
+import pytest
+from click.testing import CliRunner
+from bids2openminds.batch import find_datasets, batch_output_path, convert_datasets
+from bids2openminds.converter import cli
+
+test_data_sets = ["ds003", "eeg_cbm"]
+
+
+@pytest.fixture
+def broken_dataset(tmp_path):
+    # dataset_description.json lacks the mandatory BIDSVersion
+    dataset_path = tmp_path / "broken"
+    dataset_path.mkdir()
+    (dataset_path / "dataset_description.json").write_text('{"Name": "broken"}')
+    return str(dataset_path)
+
+
+def test_find_datasets(tmp_path):
+    for name in ["ds_b", "ds_a"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "dataset_description.json").write_text("{}")
+    (tmp_path / "not_bids").mkdir()
+    assert find_datasets(str(tmp_path)) == [
+        str(tmp_path / "ds_a"), str(tmp_path / "ds_b")]
+    assert find_datasets(str(tmp_path / "ds_a")) == [str(tmp_path / "ds_a")]
+
+    list_path = tmp_path / "datasets.txt"
+    list_path.write_text("# archive\n/data/ds_1\n\n/data/ds_2\nds_a\n")
+    # The relative paths are relative to the directory of the list
+    assert find_datasets(str(list_path)) == ["/data/ds_1", "/data/ds_2", str(tmp_path / "ds_a")]
+
+
+def test_batch_output_path():
+    assert batch_output_path("/data/ds_1/") is None
+    assert batch_output_path("/data/ds_1/", "out") == os.path.join("out", "ds_1.jsonld")
+    assert batch_output_path("/data/ds_1", "out", multiple_files=True) == os.path.join("out", "ds_1")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convert_datasets(tmp_path, broken_dataset, jobs):
+    input_paths = [os.path.join("bids-examples", data_set)
+                   for data_set in test_data_sets] + [broken_dataset]
+    output_dir = str(tmp_path / "output")
+
+    summary = convert_datasets(input_paths, jobs=jobs, output_dir=output_dir)
+
+    assert summary["succeeded"] == len(test_data_sets)
+    assert summary["failed"] == 1
+    for dataset, data_set in zip(summary["datasets"], test_data_sets):
+        assert dataset["status"] == "success"
+        assert dataset["counts"]["files"] > 0
+        assert os.path.isfile(os.path.join(output_dir, f"{data_set}.jsonld"))
+    assert summary["datasets"][-1]["status"] == "failed"
+    assert summary["datasets"][-1]["error"].startswith("BIDSValidationError")
+
+
+def test_convert_datasets_duplicate_names(tmp_path):
+    with pytest.raises(ValueError):
+        convert_datasets(["a/ds003", "b/ds003"],
+                         output_dir=str(tmp_path / "output"))
+
+
+def test_batch_click(tmp_path, broken_dataset):
+    list_path = tmp_path / "datasets.txt"
+    list_path.write_text("\n".join([os.path.abspath(os.path.join("bids-examples", test_data_sets[0])),
+                                     broken_dataset]))
+    summary_path = tmp_path / "summary.json"
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["batch", str(list_path), "-j", "2", "-o", str(tmp_path / "output"),
+                                 "--summary", str(summary_path)])
+    assert result.exit_code == 1
+    with open(summary_path, "r") as file:
+        summary = json.load(file)
+    assert [dataset["status"] for dataset in summary["datasets"]] == ["success", "failed"]
+
+
+def test_default_help_mentions_batch():
+    # The help of the default convert command is the one displayed by `bids2openminds --help`
+    result = CliRunner().invoke(cli, ["--help"])
+    assert result.exit_code == 0
+    assert "bids2openminds batch --help" in result.output
@@ -1,10 +1,10 @@
 import os
 import shutil
 from openminds import Collection
-from bids2openminds.converter import convert_click
+from bids2openminds.converter import convert_click, cli
 from click.testing import CliRunner
 
-(test_data_set, number_of_openminds_files) = ("ds003", 143)
+(test_data_set, number_of_openminds_files) = ("ds003", 146)
 
 
 def test_example_datasets_click():
@@ -37,3 +37,16 @@ def test_example_datasets_click_output_location():
     assert result.exit_code == 0
     c = Collection()
     c.load(openminds_file)
+
+
+def test_example_datasets_click_hash_cache(tmp_path):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    cache_path = str(tmp_path / "hashes.sqlite")
+    runner = CliRunner()
+    for _ in range(2):
+        result = runner.invoke(
+            cli, ["--hash-cache", cache_path, test_dir])
+        assert result.exit_code == 0
+    result = runner.invoke(cli, ["hash-cache", "prune", cache_path])
+    assert result.exit_code == 0
+    assert result.output.startswith("Removed 0 entries")
@@ -96,3 +96,15 @@ def test_random_folder(test_dir, path_list, bundle, parent_bundle, generate_file
     else:
         assert dataset_bundle.is_part_of.type_ == "https://openminds.ebrains.eu/core/FileRepository"
         assert dataset_bundle.is_part_of.iri.value == file_repository_iri
+
+
+def test_file_bundle_file_stats(test_dir):
+    file_stats = {}
+    file_bundles, files_size, file_repository = create_file_bundle(
+        test_dir, test_dir, Collection(), is_file_repository=True, file_stats=file_stats)
+
+    assert file_stats.keys() == file_bundles.keys()
+    assert sum(file_stat.st_size for file_stat in file_stats.values()) == files_size
+    assert file_repository.storage_size.value == files_size
+    for file_path, file_stat in file_stats.items():
+        assert file_stat.st_size == os.stat(file_path).st_size
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+from bids2openminds.main import describe_files
+
+# (subject, suffix, extension, expected content description, expected data type, expected format, whether the format is detected from the header)
+example_files = [(None, "participants", ".tsv", "A metadata table for participants.", "table", "text/tab-separated-values", False),
+                 (None, "participants", ".json", "A JSON metadata file of participants TSV.",
+                  "associative array", "application/json", False),
+                 ("01", "events", ".tsv", "Event file for events of subject 01",
+                  "event sequence", "text/tab-separated-values", False),
+                 ("01", "bold", ".json", "A JSON metadata file for bold of subject 01",
+                  "associative array", "application/json", False),
+                 ("02", "T1w", ".nii.gz", "Data file for T1w of subject 02",
+                  "voxel data", None, True),
+                 ("02", "physio", ".tsv.gz", None, None, None, False),
+                 (None, "description", ".json", None, None, None, False)]
+
+
+@pytest.fixture
+def described_files():
+    layout_df = pd.DataFrame({"path": [f"/dataset/file{i}" for i in range(len(example_files))],
+                              "subject": [item[0] for item in example_files],
+                              "suffix": [item[1] for item in example_files],
+                              "extension": [item[2] for item in example_files]})
+    return describe_files(layout_df)
+
+
+@pytest.mark.parametrize("index", range(len(example_files)))
+def test_describe_files(described_files, index):
+    _, _, extension, content_description, data_type, file_format, detect = example_files[index]
+    extensions, detect_format, content_descriptions, data_types, file_formats = described_files
+
+    assert extensions[index] == extension
+    assert content_descriptions[index] == content_description
+    assert detect_format[index] == detect
+    if data_type is None:
+        assert data_types[index] is None
+    else:
+        assert data_types[index].name == data_type
+    if file_format is None:
+        assert file_formats[index] is None
+    else:
+        assert file_formats[index].name == file_format
@@ -0,0 +1,62 @@
+import gzip
+import hashlib
+import mmap
+import os
+import pytest
+from bids2openminds.headers import HeaderReader
+from bids2openminds.utility import file_digest, file_hash
+
+# (file size in bytes, buffer size in bytes)
+example_sizes = [(0, 16), (15, 16), (16, 16), (17, 16), (100000, 4096), (100000, 1024 * 1024)]
+
+
+@pytest.mark.parametrize("file_size, buffer_size", example_sizes)
+def test_file_hash(tmp_path, file_size, buffer_size):
+    content = os.urandom(file_size)
+    file_path = tmp_path / "sub-01_T1w.nii.gz"
+    file_path.write_bytes(content)
+
+    openminds_hash = file_hash(str(file_path), buffer_size=buffer_size)
+
+    assert openminds_hash.algorithm == "MD5"
+    assert openminds_hash.digest == hashlib.md5(content).hexdigest()
+
+
+def test_file_hash_invalid_buffer(tmp_path):
+    file_path = tmp_path / "participants.tsv"
+    file_path.write_bytes(b"participant_id\n")
+    with pytest.raises(ValueError):
+        file_hash(str(file_path), buffer_size=0)
+
+
+@pytest.mark.parametrize("file_size, buffer_size", example_sizes)
+def test_file_digest_mmap(tmp_path, file_size, buffer_size):
+    content = os.urandom(file_size)
+    file_path = tmp_path / "sub-01_T1w.nii"
+    file_path.write_bytes(content)
+
+    # Empty files can't be mapped and are read instead
+    assert file_digest(str(file_path), buffer_size=buffer_size, mmap_threshold=0) == hashlib.md5(content).hexdigest()
+
+
+def test_file_digest_mmap_header(tmp_path):
+    content = gzip.compress((348).to_bytes(4, "little") + os.urandom(100000))
+    file_path = tmp_path / "sub-01_T1w.nii.gz"
+    file_path.write_bytes(content)
+
+    header_reader = HeaderReader(4, compressed=True)
+    assert file_digest(str(file_path), buffer_size=16, header_reader=header_reader, mmap_threshold=0) == \
+        hashlib.md5(content).hexdigest()
+    assert header_reader.header == (348).to_bytes(4, "little")
+
+
+def test_file_digest_mmap_fallback(tmp_path, monkeypatch):
+    content = os.urandom(100000)
+    file_path = tmp_path / "sub-01_T1w.nii"
+    file_path.write_bytes(content)
+
+    def unsupported(*args, **kwargs):
+        raise OSError("mmap is not supported")
+
+    monkeypatch.setattr(mmap, "mmap", unsupported)
+    assert file_digest(str(file_path), mmap_threshold=0) == hashlib.md5(content).hexdigest()
@@ -0,0 +1,52 @@
+import os
+import pytest
+from bids2openminds.hash_cache import HashCache
+from bids2openminds.utility import file_digest
+
+
+@pytest.fixture
+def example_file(tmp_path):
+    file_path = tmp_path / "sub-01_T1w.nii"
+    file_path.write_bytes(os.urandom(1000))
+    return str(file_path)
+
+
+def test_hash_cache_roundtrip(tmp_path, example_file):
+    cache_path = str(tmp_path / "cache.sqlite")
+    digest = file_digest(example_file)
+
+    with HashCache(cache_path) as cache:
+        assert cache.get(example_file, os.stat(example_file)) is None
+        cache.set(example_file, os.stat(example_file), digest)
+
+    with HashCache(cache_path) as cache:
+        assert cache.get(example_file, os.stat(example_file)) == digest
+        assert cache.get(example_file, os.stat(example_file), "SHA256") is None
+        assert cache.hits == 1
+
+
+def test_hash_cache_changed_file(tmp_path, example_file):
+    with HashCache(str(tmp_path / "cache.sqlite")) as cache:
+        cache.set(example_file, os.stat(example_file),
+                  file_digest(example_file))
+        with open(example_file, "ab") as file:
+            file.write(b"new volume")
+        assert cache.get(example_file, os.stat(example_file)) is None
+        assert cache.prune() == 1
+        assert len(cache) == 0
+
+
+def test_hash_cache_eviction(tmp_path):
+    with HashCache(str(tmp_path / "cache.sqlite"), max_entries=2) as cache:
+        paths = []
+        for i in range(4):
+            file_path = tmp_path / f"sub-0{i}_T1w.nii"
+            file_path.write_bytes(os.urandom(10))
+            paths.append(str(file_path))
+            cache.set(paths[-1], os.stat(paths[-1]), file_digest(paths[-1]))
+        # the first file was used most recently, so it is kept with the newest one
+        assert cache.get(paths[0], os.stat(paths[0])) is not None
+        assert cache.evict() == 2
+        assert cache.get(paths[0], os.stat(paths[0])) is not None
+        assert cache.get(paths[1], os.stat(paths[1])) is None
+        assert cache.get(paths[3], os.stat(paths[3])) is not None
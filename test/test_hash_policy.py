@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+import json
+import os
+import pytest
+from click.testing import CliRunner
+import bids2openminds.converter
+from bids2openminds.converter import cli
+from bids2openminds.hash_policy import FINGERPRINT_ALGORITHM, HashPolicy, parse_hash_policy
+from bids2openminds.utility import file_fingerprint, probe_file
+
+test_data_set = "ds003"
+
+
+@pytest.mark.parametrize("policy,expected", [("full", HashPolicy("full", None)), ("none", HashPolicy("none", None)),
+                                             (" Fingerprint ", HashPolicy("fingerprint", None)),
+                                             ("max-size=1000", HashPolicy("max-size", 1000)),
+                                             ("max-size=1.5K", HashPolicy("max-size", 1536)),
+                                             ("max-size=2GiB", HashPolicy("max-size", 2 * 1024 ** 3))])
+def test_parse_hash_policy(policy, expected):
+    assert parse_hash_policy(policy) == expected
+    assert parse_hash_policy(expected) is expected
+
+
+@pytest.mark.parametrize("policy", ["partial", "max-size", "max-size=", "max-size=big", "full=1", "none=0"])
+def test_parse_invalid_hash_policy(policy):
+    with pytest.raises(ValueError):
+        parse_hash_policy(policy)
+
+
+def test_hash_policy():
+    assert [parse_hash_policy("max-size=100").hashes(size) for size in [0, 99, 100]] == [True, True, False]
+    assert not parse_hash_policy("none").hashes(0)
+    assert parse_hash_policy("fingerprint").read_size(10 ** 9) == 2 * 64 * 1024
+    assert parse_hash_policy("max-size=100").read_size(100) == 0
+
+
+def test_file_fingerprint(tmp_path):
+    file_path = tmp_path / "sub-01_T1w.nii"
+    small_content = os.urandom(100)
+    file_path.write_bytes(small_content)
+    assert file_fingerprint(str(file_path), block_size=64) == \
+        hashlib.md5((100).to_bytes(8, "little") + small_content).hexdigest()
+
+    content = bytearray(os.urandom(1000))
+    file_path.write_bytes(content)
+    fingerprint = file_fingerprint(str(file_path), block_size=64)
+    assert fingerprint == hashlib.md5((1000).to_bytes(8, "little") + content[:64] + content[-64:]).hexdigest()
+
+    # Only the size, the start and the end of the file are fingerprinted
+    content[500] ^= 0xFF
+    file_path.write_bytes(content)
+    assert file_fingerprint(str(file_path), block_size=64) == fingerprint
+    file_path.write_bytes(content + b"\0")
+    assert file_fingerprint(str(file_path), block_size=64) != fingerprint
+
+
+def test_probe_file_fingerprint(tmp_path):
+    file_path = tmp_path / "sub-01_T1w.nii.gz"
+    file_path.write_bytes(gzip.compress((348).to_bytes(4, "little") + os.urandom(200000)))
+    assert probe_file(str(file_path), True, ".nii.gz", fingerprint=True) == \
+        ((file_fingerprint(str(file_path)),), "application/vnd.nifti.1")
+
+
+def test_hash_policy_click(tmp_path):
+    result = CliRunner().invoke(cli, ["convert", str(tmp_path), "--hash-policy", "partial"])
+    assert result.exit_code == 2
+    assert "hash policy" in result.output
+
+
+@pytest.mark.parametrize("policy", ["none", "max-size=1000", "fingerprint"])
+def test_convert_hash_policy(tmp_path, policy):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    output_path = str(tmp_path / "openminds.jsonld")
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=output_path, quiet=True,
+                                     hash_policy=policy)
+
+    with open(output_path, "r") as file:
+        files = [node for node in json.load(file)["@graph"] if node["@type"].endswith("/File")]
+    hash_policy = parse_hash_policy(policy)
+    algorithm = FINGERPRINT_ALGORITHM if policy == "fingerprint" else "MD5"
+    for node in files:
+        if hash_policy.hashes(node["storageSize"]["value"]):
+            assert [file_hash["algorithm"] for file_hash in node["hash"]] == [algorithm]
+        else:
+            assert "hash" not in node
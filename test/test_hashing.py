@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sys
+import pytest
+from click.testing import CliRunner
+import bids2openminds.converter
+from bids2openminds.converter import cli
+from bids2openminds.hashing import MultiHash, hash_constructor, parse_hash_algorithms
+from bids2openminds.utility import file_digests, probe_file
+
+test_data_set = "ds003"
+
+
+def test_parse_hash_algorithms():
+    assert parse_hash_algorithms("MD5") == ("MD5",)
+    assert parse_hash_algorithms("sha256, md5,MD5") == ("SHA256", "MD5")
+    assert parse_hash_algorithms(["blake2b", "sha3_256"]) == ("BLAKE2B", "SHA3_256")
+
+
+@pytest.mark.parametrize("algorithms", ["", "crc32", "md5,unknown", "shake_128"])
+def test_parse_invalid_hash_algorithms(algorithms):
+    with pytest.raises(ValueError):
+        parse_hash_algorithms(algorithms)
+
+
+def test_missing_optional_algorithm(monkeypatch):
+    # A None entry in sys.modules makes the import fail as if the package wasn't installed
+    monkeypatch.setitem(sys.modules, "xxhash", None)
+    hash_constructor.cache_clear()
+    with pytest.raises(ValueError, match="pip install xxhash"):
+        parse_hash_algorithms("xxh64")
+    hash_constructor.cache_clear()
+
+
+def test_optional_algorithm(tmp_path):
+    xxhash = pytest.importorskip("xxhash")
+    file_path = tmp_path / "sub-01_T1w.nii"
+    content = os.urandom(100000)
+    file_path.write_bytes(content)
+    assert file_digests(str(file_path), ("XXH3_128", "MD5")) == \
+        (xxhash.xxh3_128(content).hexdigest(), hashlib.md5(content).hexdigest())
+
+
+def test_multi_hash():
+    hash_object = MultiHash(["MD5", "SHA256"])
+    hash_object.update(b"sub-01")
+    hash_object.update(b"_T1w")
+    assert hash_object.hexdigests() == (hashlib.md5(b"sub-01_T1w").hexdigest(),
+                                        hashlib.sha256(b"sub-01_T1w").hexdigest())
+
+
+@pytest.mark.parametrize("mmap_threshold", [None, 0])
+def test_file_digests(tmp_path, mmap_threshold):
+    file_path = tmp_path / "sub-01_T1w.nii"
+    content = os.urandom(100000)
+    file_path.write_bytes(content)
+    assert file_digests(str(file_path), ("SHA256", "MD5", "BLAKE2B"), buffer_size=4096,
+                        mmap_threshold=mmap_threshold) == \
+        (hashlib.sha256(content).hexdigest(), hashlib.md5(content).hexdigest(), hashlib.blake2b(content).hexdigest())
+
+
+def test_probe_file_algorithms(tmp_path):
+    file_path = tmp_path / "sub-01_T1w.nii"
+    content = (348).to_bytes(4, "little") + os.urandom(1000)
+    file_path.write_bytes(content)
+    assert probe_file(str(file_path), True, ".nii", algorithms=("SHA1", "MD5")) == \
+        ((hashlib.sha1(content).hexdigest(), hashlib.md5(content).hexdigest()), "application/vnd.nifti.1")
+
+
+def test_hash_click(tmp_path):
+    result = CliRunner().invoke(cli, ["convert", str(tmp_path), "--hash", "sha256,crc32"])
+    assert result.exit_code == 2
+    assert "crc32" in result.output
+
+
+def test_fingerprint_algorithms(tmp_path):
+    with pytest.raises(ValueError):
+        bids2openminds.converter.convert(str(tmp_path), hash_policy="fingerprint", hash_algorithms="sha256")
+
+
+def test_convert_hash_algorithms(tmp_path):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    output_path = str(tmp_path / "openminds.jsonld")
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=output_path, quiet=True,
+                                     hash_algorithms="sha256,md5", jobs=2)
+
+    with open(output_path, "r") as file:
+        files = [node for node in json.load(file)["@graph"] if node["@type"].endswith("/File")]
+    for node in files:
+        with open(node["IRI"][len("file://"):], "rb") as file:
+            content = file.read()
+        assert [(file_hash["algorithm"], file_hash["digest"]) for file_hash in node["hash"]] == \
+            [("SHA256", hashlib.sha256(content).hexdigest()), ("MD5", hashlib.md5(content).hexdigest())]
@@ -0,0 +1,76 @@
+import builtins
+import gzip
+import hashlib
+import pytest
+from bids2openminds import headers
+from bids2openminds.headers import HeaderReader, header_detector, nifti_version, register_header_detector
+from bids2openminds.utility import probe_file, read_nifti_version
+
+nifti1_header = (348).to_bytes(4, "little") + bytes(344)
+nifti2_header = (540).to_bytes(4, "big") + bytes(536)
+
+
+@pytest.mark.parametrize("header,version", [(nifti1_header, 1), (nifti2_header, 2), (bytes(4), None),
+                                            (b"\x01\x02\x03\x04", None), (b"", None)])
+def test_nifti_version(header, version):
+    assert nifti_version(header) == version
+
+
+def test_header_detector():
+    assert header_detector(".nii")[1] is False
+    assert header_detector(".nii.gz")[1] is True
+    assert header_detector(".tsv") is None
+    assert header_detector(".tsv.gz") is None
+    assert header_detector(None) is None
+
+
+def test_header_reader_gzip():
+    content = gzip.compress(nifti1_header * 100)
+    header_reader = HeaderReader(4, compressed=True)
+    for start in range(0, len(content), 7):
+        header_reader.feed(content[start:start + 7])
+    assert header_reader.complete
+    assert header_reader.header == nifti1_header[:4]
+
+    header_reader = HeaderReader(4, compressed=True)
+    header_reader.feed(nifti1_header)
+    assert header_reader.complete
+    assert header_reader.header == b""
+
+
+@pytest.mark.parametrize("name,content,file_format", [
+    ("T1w.nii", nifti1_header, "application/vnd.nifti.1"),
+    ("T1w.nii.gz", gzip.compress(nifti2_header), "application/vnd.nifti.2"),
+    ("T1w.nii.gz", nifti1_header, None),
+    ("T1w.nii", b"", None),
+])
+def test_probe_file(tmp_path, monkeypatch, name, content, file_format):
+    path = tmp_path / name
+    path.write_bytes(content)
+    extension = ".nii.gz" if name.endswith(".gz") else ".nii"
+
+    opened = []
+    original_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(file)
+        return original_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    assert probe_file(str(path), True, extension) == ((hashlib.md5(content).hexdigest(),), file_format)
+    assert probe_file(str(path), True, extension, compute_digest=False) == (None, file_format)
+    assert probe_file(str(path), False, extension) == ((hashlib.md5(content).hexdigest(),), None)
+    monkeypatch.undo()
+
+    # Each probe opens the file once
+    assert opened == [str(path)] * 3
+    expected_version = {"application/vnd.nifti.1": 1, "application/vnd.nifti.2": 2}.get(file_format)
+    assert read_nifti_version(str(path), extension) == expected_version
+
+
+def test_register_header_detector(tmp_path, monkeypatch):
+    monkeypatch.setattr(headers, "HEADER_DETECTORS", dict(headers.HEADER_DETECTORS))
+    register_header_detector([".edf"], 8, lambda header: "application/edf" if header == b"0       " else None)
+    path = tmp_path / "eeg.edf"
+    path.write_bytes(b"0       " + bytes(248))
+    assert probe_file(str(path), True, ".edf", compute_digest=False) == (None, "application/edf")
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Modules taking seconds to import, which must only be loaded once a conversion starts
+heavy_modules = ["bids", "openminds", "pandas", "nameparser", "sqlalchemy"]
+
+
+def import_times(statement):
+    # Runs the statement in a fresh interpreter and returns the cumulative import time of each module
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("statement", ["import bids2openminds.converter",
+                                       "from bids2openminds.converter import cli\n"
+                                       "try:\n    cli(['--help'])\nexcept SystemExit:\n    pass"])
+def test_cli_imports(statement):
+    times = import_times(statement)
+    imported_modules = {module.split(".")[0] for module in times}
+    assert imported_modules.isdisjoint(heavy_modules)
+
+
+def test_fast_backend_imports(tmp_path):
+    # The fast backend doesn't index the dataset with pybids, which must not be imported
+    os.makedirs(tmp_path / "sub-01" / "anat")
+    with open(tmp_path / "dataset_description.json", "w") as file:
+        json.dump({"Name": "Fast dataset", "BIDSVersion": "1.8.0"}, file)
+    (tmp_path / "sub-01" / "anat" / "sub-01_T1w.nii").write_bytes(bytes(352))
+    statement = ("import json\nimport sys\n"
+                 "from bids2openminds.converter import convert\n"
+                 f"convert({str(tmp_path)!r}, quiet=True, backend='fast')\n"
+                 "print(json.dumps(sorted({module.split('.')[0] for module in sys.modules})))")
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, check=True)
+    imported_modules = set(json.loads(result.stdout.splitlines()[-1]))
+    assert imported_modules.isdisjoint(["bids", "sqlalchemy"])
@@ -0,0 +1,56 @@
+import os
+import shutil
+import pytest
+import bids2openminds.converter
+import bids2openminds.utility
+
+test_data_set = "ds003"
+
+
+def detect_files(collection):
+    files = {}
+    for item in collection:
+        if item.type_ == "https://openminds.ebrains.eu/core/File":
+            files[item.iri.value] = item
+    return files
+
+
+@pytest.mark.parametrize("multiple_files", [False, True])
+def test_incremental_conversion(tmp_path, monkeypatch, multiple_files):
+    test_dir = str(tmp_path / test_data_set)
+    shutil.copytree(os.path.join("bids-examples", test_data_set), test_dir)
+    bids2openminds.converter.convert(
+        test_dir, save_output=True, multiple_files=multiple_files, quiet=True)
+
+    changed_file = os.path.join(test_dir, "participants.tsv")
+    with open(changed_file, "a") as file:
+        file.write("\n")
+
+    hashed_files = []
+    file_digests = bids2openminds.utility.file_digests
+
+    def counting_file_digests(file_path, *args, **kwargs):
+        hashed_files.append(file_path)
+        return file_digests(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(bids2openminds.utility,
+                        "file_digests", counting_file_digests)
+    incremental_collection = bids2openminds.converter.convert(
+        test_dir, save_output=True, multiple_files=multiple_files, quiet=True, incremental=True)
+    assert hashed_files == [changed_file]
+
+    monkeypatch.setattr(bids2openminds.utility, "file_digests", file_digests)
+    full_collection = bids2openminds.converter.convert(test_dir, quiet=True)
+
+    incremental_files = detect_files(incremental_collection)
+    full_files = detect_files(full_collection)
+    assert incremental_files.keys() == full_files.keys()
+    for iri, full_file in full_files.items():
+        incremental_file = incremental_files[iri]
+        assert [file_hash.digest for file_hash in incremental_file.hashes] == \
+            [file_hash.digest for file_hash in full_file.hashes]
+        assert incremental_file.storage_size.value == full_file.storage_size.value
+        if full_file.format is None:
+            assert incremental_file.format is None
+        else:
+            assert incremental_file.format.id == full_file.format.id
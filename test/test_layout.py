@@ -0,0 +1,138 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from bids import BIDSLayout
+from bids2openminds.layout import DataFrameLayout, tree_signature, load_layout, parse_entities
+
+test_data_set = "ds000247"
+
+parity_data_sets = ["ds003", "ds000247", "eeg_cbm", "asl001", "eeg_rest_fmri"]
+
+entity_columns = ["subject", "session", "task",
+                  "run", "suffix", "datatype", "extension"]
+
+
+def assert_layout_parity(input_path):
+    # pybids lists the files without entities, such as README, in an arbitrary order
+    pybids_layout = BIDSLayout(input_path)
+    pybids_df = pybids_layout.to_df().sort_values("path", ignore_index=True)
+    fast_layout = load_layout(input_path, backend="fast")
+    fast_df = fast_layout.to_df().sort_values("path", ignore_index=True)
+
+    assert fast_df["path"].tolist() == pybids_df["path"].tolist()
+    for column in entity_columns:
+        pybids_values = pybids_df[column] if column in pybids_df else pd.Series(
+            [None] * len(pybids_df))
+        assert [None if pd.isnull(value) else value for value in fast_df[column]] == [
+            None if pd.isnull(value) else value for value in pybids_values]
+    assert fast_layout.get_subjects() == sorted(pybids_layout.get_subjects())
+    assert fast_layout.get_sessions() == sorted(pybids_layout.get_sessions())
+    assert fast_layout.get_tasks() == sorted(pybids_layout.get_tasks())
+
+
+@pytest.fixture(scope="module")
+def bids_layout():
+    return BIDSLayout(os.path.join("bids-examples", test_data_set))
+
+
+def test_dataframe_layout(bids_layout):
+    dataframe_layout = load_layout(
+        bids_layout.root, layout=bids_layout.to_df())
+    assert isinstance(dataframe_layout, DataFrameLayout)
+    assert dataframe_layout.get_subjects() == sorted(bids_layout.get_subjects())
+    assert dataframe_layout.get_sessions() == sorted(bids_layout.get_sessions())
+    assert dataframe_layout.get_tasks() == sorted(bids_layout.get_tasks())
+
+
+def test_tree_signature(tmp_path):
+    (tmp_path / "sub-01").mkdir()
+    file_path = tmp_path / "sub-01" / "sub-01_T1w.nii"
+    file_path.write_bytes(b"\x5c\x01\x00\x00")
+    signature = tree_signature(str(tmp_path))
+    assert tree_signature(str(tmp_path)) == signature
+
+    ignored_path = tmp_path / "openminds.jsonld"
+    ignored_path.write_text("{}")
+    assert tree_signature(str(tmp_path), ignore=[
+                          str(ignored_path)]) == signature
+    ignored_path.unlink()
+
+    # The paths pybids doesn't index don't change the signature, and the links to directories are not followed
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "index").write_bytes(b"DIRC")
+    (tmp_path / "code").mkdir()
+    (tmp_path / "code" / "convert.py").write_text("")
+    assert tree_signature(str(tmp_path)) == signature
+    if hasattr(os, "symlink") and os.name != "nt":
+        (tmp_path / "sub-01" / "loop").symlink_to(tmp_path)
+        assert tree_signature(str(tmp_path)) != signature
+        signature = tree_signature(str(tmp_path))
+
+    file_path.write_bytes(b"\x1c\x02\x00\x00\x00")
+    assert tree_signature(str(tmp_path)) != signature
+
+
+def test_cached_layout(tmp_path, monkeypatch):
+    test_dir = str(tmp_path / test_data_set)
+    shutil.copytree(os.path.join("bids-examples", test_data_set), test_dir)
+    layout_db = str(tmp_path / "layout_db")
+
+    reset_databases = []
+
+    def spy_bids_layout(*args, **kwargs):
+        reset_databases.append(kwargs["reset_database"])
+        return BIDSLayout(*args, **kwargs)
+
+    monkeypatch.setattr("bids.BIDSLayout", spy_bids_layout)
+
+    first_df = load_layout(test_dir, layout_db=layout_db).to_df()
+    second_df = load_layout(test_dir, layout_db=layout_db).to_df()
+    with open(os.path.join(test_dir, "participants.tsv"), "a") as file:
+        file.write("\n")
+    load_layout(test_dir, layout_db=layout_db)
+
+    assert reset_databases == [True, False, True]
+    assert sorted(first_df["path"]) == sorted(second_df["path"])
+
+
+def test_parse_entities():
+    assert parse_entities("/sub-01/ses-pre/func/sub-01_ses-pre_task-rest_run-02_bold.nii.gz") == {
+        "subject": "01", "session": "pre", "task": "rest", "run": 2, "suffix": "bold", "datatype": "func",
+        "extension": ".nii.gz"}
+    assert parse_entities("/participants.tsv") == {
+        "suffix": "participants", "extension": ".tsv"}
+    assert parse_entities("/README") == {}
+
+
+@pytest.mark.parametrize("data_set", parity_data_sets)
+def test_fast_layout_parity(data_set):
+    assert_layout_parity(os.path.join("bids-examples", data_set))
+
+
+def test_fast_layout_parity_ignored_files(tmp_path):
+    files = ["README", "CHANGES", "participants.tsv", "task-rest_bold.json", "notbids.txt", ".hidden.tsv",
+             "code/convert.py", "sourcedata/sub-01/anat/sub-01_T1w.nii",
+             "derivatives/pipeline/sub-01/anat/sub-01_T1w.nii", "sub-01/anat/notbids.txt",
+             "sub-01/anat/sub-01_T1w.xyz", "sub-01/meg/sub-01_task-rest_meg.ds/BadChannels", "sub-01/meg/sub-01_task-rest_meg.json"]
+    for subject in ["01", "02"]:
+        for session in ["pre", "post"]:
+            prefix = f"sub-{subject}/ses-{session}"
+            files += [f"{prefix}/anat/sub-{subject}_ses-{session}_T1w.nii.gz",
+                      f"{prefix}/func/sub-{subject}_ses-{session}_task-rest_run-1_bold.nii.gz",
+                      f"{prefix}/func/sub-{subject}_ses-{session}_task-rest_run-1_events.tsv",
+                      f"{prefix}/sub-{subject}_ses-{session}_scans.tsv"]
+    for file in files:
+        (tmp_path / file).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / file).write_text("")
+    (tmp_path / "task-rest_bold.json").write_text("{}")
+    (tmp_path / "dataset_description.json").write_text(
+        '{"Name": "test", "BIDSVersion": "1.8.0"}')
+
+    assert_layout_parity(str(tmp_path))
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        load_layout(os.path.join("bids-examples",
+                    test_data_set), backend="sqlite")
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import pytest
+from click.testing import CliRunner
+from bids2openminds.converter import cli, convert
+from bids2openminds.manifest import ChecksumManifest
+
+# A digest which isn't the one of the content, to check that the files listed in a manifest are not read
+RECORDED_DIGEST = "0123456789abcdef0123456789abcdef"
+
+
+def test_md5sum_manifest(tmp_path):
+    manifest_path = tmp_path / "MD5SUMS"
+    manifest_path.write_text(f"{RECORDED_DIGEST}  sub-01/anat/sub-01_T1w.nii.gz\n"
+                             f"{'A' * 32} *participants.tsv\n"
+                             f"\\{'b' * 32}  sub-01/odd\\\\name\\n.tsv\n"
+                             "\n")
+    manifest = ChecksumManifest(str(manifest_path))
+    assert len(manifest) == 3
+    assert manifest.get(str(tmp_path / "sub-01" / "anat" / "sub-01_T1w.nii.gz")) == RECORDED_DIGEST
+    # The paths are normalized and the digests recorded in lower case
+    assert manifest.get(str(tmp_path / "sub-01" / ".." / "participants.tsv"), "MD5") == "a" * 32
+    assert manifest.get(str(tmp_path / "sub-01" / "odd\\name\n.tsv")) == "b" * 32
+    assert manifest.get(str(tmp_path / "participants.tsv"), "SHA256") is None
+
+
+def test_tagged_manifest(tmp_path):
+    manifest_path = tmp_path / "checksums.txt"
+    manifest_path.write_text(f"MD5 (participants.tsv) = {RECORDED_DIGEST}\n"
+                             f"SHA256 (participants.tsv) = {'c' * 64}\n"
+                             f"{'d' * 40}  README\n")
+    manifest = ChecksumManifest([manifest_path])
+    assert manifest.get(str(tmp_path / "participants.tsv"), "MD5") == RECORDED_DIGEST
+    assert manifest.get(str(tmp_path / "participants.tsv"), "SHA256") == "c" * 64
+    # Without an algorithm in the name of the manifest, it is deduced from the length of the digest
+    assert manifest.get(str(tmp_path / "README"), "SHA1") == "d" * 40
+
+
+def test_bagit_manifest(tmp_path):
+    (tmp_path / "manifest-sha256.txt").write_text(f"{'e' * 64} data/sub-01/anat/sub-01%25T1w.nii.gz\n")
+    (tmp_path / "manifest-md5.txt").write_text(f"{RECORDED_DIGEST}   data/participants.tsv\n")
+    manifest = ChecksumManifest(str(tmp_path))
+    assert manifest.get(str(tmp_path / "data" / "sub-01" / "anat" / "sub-01%T1w.nii.gz"), "SHA256") == "e" * 64
+    assert manifest.get(str(tmp_path / "data" / "participants.tsv")) == RECORDED_DIGEST
+
+
+@pytest.mark.parametrize("content", ["not a digest\n", f"{'f' * 33}  participants.tsv\n",
+                                     f"{'a' * 32}  README\n{'b' * 32}  README\n"])
+def test_invalid_manifest(tmp_path, content):
+    manifest_path = tmp_path / "checksums.txt"
+    manifest_path.write_text(content)
+    with pytest.raises(ValueError):
+        ChecksumManifest(str(manifest_path))
+
+
+def test_manifest_directory_without_manifest(tmp_path):
+    with pytest.raises(ValueError):
+        ChecksumManifest(str(tmp_path))
+
+
+@pytest.fixture
+def manifest_dataset(tmp_path):
+    dataset_path = tmp_path / "dataset"
+    os.makedirs(dataset_path / "sub-01" / "anat")
+    with open(dataset_path / "dataset_description.json", "w") as file:
+        json.dump({"Name": "Archived dataset", "BIDSVersion": "1.8.0"}, file)
+    (dataset_path / "sub-01" / "anat" / "sub-01_T1w.nii").write_bytes(os.urandom(1000))
+    manifest_path = tmp_path / "MD5SUMS"
+    manifest_path.write_text(f"{RECORDED_DIGEST}  dataset/sub-01/anat/sub-01_T1w.nii\n")
+    return dataset_path, manifest_path
+
+
+def read_digests(output_path):
+    with open(output_path) as file:
+        return {node["name"]: [hash_node["digest"] for hash_node in node["hash"]]
+                for node in json.load(file)["@graph"] if node["@type"].endswith("/File")}
+
+
+def test_convert_checksum_manifest(manifest_dataset, tmp_path):
+    dataset_path, manifest_path = manifest_dataset
+    output_path = tmp_path / "openminds.jsonld"
+    convert(str(dataset_path), save_output=True, output_path=str(output_path), quiet=True,
+            checksum_manifest=str(manifest_path))
+    digests = read_digests(output_path)
+    assert digests["sub-01_T1w.nii"] == [RECORDED_DIGEST]
+    # The files missing from the manifest are hashed
+    with open(dataset_path / "dataset_description.json", "rb") as file:
+        assert digests["dataset_description.json"] == [hashlib.md5(file.read()).hexdigest()]
+
+    # The recorded digest doesn't match the content of the file
+    with pytest.raises(ValueError, match="checksum manifest"):
+        convert(str(dataset_path), save_output=True, output_path=str(output_path), quiet=True,
+                checksum_manifest=str(manifest_path), verify_checksums=1)
+
+
+def test_convert_checksum_manifest_cli(manifest_dataset, tmp_path):
+    dataset_path, manifest_path = manifest_dataset
+    with open(dataset_path / "sub-01" / "anat" / "sub-01_T1w.nii", "rb") as file:
+        manifest_path.write_text(f"{hashlib.md5(file.read()).hexdigest()}  dataset/sub-01/anat/sub-01_T1w.nii\n")
+    output_path = tmp_path / "openminds.jsonld"
+    result = CliRunner().invoke(cli, [str(dataset_path), "-o", str(output_path), "-q", "--checksum-manifest",
+                                      str(manifest_path), "--verify-checksums", "5"])
+    assert result.exit_code == 0, result.output
+    with open(dataset_path / "sub-01" / "anat" / "sub-01_T1w.nii", "rb") as file:
+        assert read_digests(output_path)["sub-01_T1w.nii"] == [hashlib.md5(file.read()).hexdigest()]
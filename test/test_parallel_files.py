@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import pytest
+from bids import BIDSLayout
+from click.testing import CliRunner
+from openminds import Collection
+from bids2openminds import utility
+from bids2openminds.converter import cli, convert
+from bids2openminds.main import create_file
+
+test_data_set = "ds003"
+
+
+@pytest.mark.parametrize("jobs", [2, 4, 0])
+def test_parallel_create_file(jobs):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    layout_df = BIDSLayout(test_dir).to_df()
+
+    serial_files, _ = create_file(layout_df, test_dir, Collection(), jobs=1)
+    parallel_files, _ = create_file(
+        layout_df, test_dir, Collection(), jobs=jobs)
+
+    assert len(serial_files) == len(parallel_files)
+    for serial_file, parallel_file in zip(serial_files, parallel_files):
+        assert serial_file.iri.value == parallel_file.iri.value
+        assert [file_hash.digest for file_hash in serial_file.hashes] == \
+            [file_hash.digest for file_hash in parallel_file.hashes]
+        assert serial_file.storage_size.value == parallel_file.storage_size.value
+        if serial_file.format is None:
+            assert parallel_file.format is None
+        else:
+            assert serial_file.format.id == parallel_file.format.id
+
+
+@pytest.mark.skipif(os.name == "nt", reason="The scan doesn't get the inodes of the files on Windows")
+@pytest.mark.parametrize("io_concurrency", [None, 4])
+def test_hardlinks_hashed_once(tmp_path, monkeypatch, io_concurrency):
+    # The same NIfTI file is linked in the directories of three subjects
+    content = (348).to_bytes(4, "little") + bytes(340) + b"n+1\0" + os.urandom(1000)
+    paths = [tmp_path / f"sub-0{subject}" / "anat" / f"sub-0{subject}_T1w.nii" for subject in [1, 2, 3]]
+    for path in paths:
+        os.makedirs(path.parent)
+    with open(tmp_path / "dataset_description.json", "w") as file:
+        json.dump({"Name": "Hardlinked dataset", "BIDSVersion": "1.8.0"}, file)
+    paths[0].write_bytes(content)
+    for path in paths[1:]:
+        os.link(paths[0], path)
+
+    read_paths = []
+    file_digests = utility.file_digests
+
+    def counting_file_digests(file_path, *args, **kwargs):
+        read_paths.append(file_path)
+        return file_digests(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(utility, "file_digests", counting_file_digests)
+    layout_df = BIDSLayout(str(tmp_path)).to_df()
+    files, _ = create_file(layout_df, str(tmp_path), Collection(), io_concurrency=io_concurrency)
+
+    assert sum(path.endswith("_T1w.nii") for path in read_paths) == 1
+    linked_files = [file for file in files if file.name.endswith("_T1w.nii")]
+    assert len(linked_files) == 3
+    for file in linked_files:
+        # The paths of the same physical file share its Hash objects
+        assert file.hashes[0] is linked_files[0].hashes[0]
+        assert file.hashes[0].digest == hashlib.md5(content).hexdigest()
+        assert file.format.id.endswith("application_vnd.nifti.1")
+
+
+def test_negative_jobs(tmp_path):
+    with pytest.raises(ValueError, match="jobs"):
+        convert(str(tmp_path), jobs=-1)
+    for command in [[], ["batch"]]:
+        result = CliRunner().invoke(cli, [*command, str(tmp_path), "-j", "-1"])
+        assert result.exit_code == 2
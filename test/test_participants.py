@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+from bids2openminds.main import participants_openminds, create_openminds_age, handedness_openminds, sex_openminds, spices_openminds
+from bids2openminds.utility import table_filter
+
+participants_table = pd.DataFrame(data={"participant_id": ["sub-01", "sub-02", "sub-03", "sub-04", "sub-01"],
+                                        "age": [34, None, 25, 34, 60],
+                                        "sex": ["M", "F", "female", "M", "F"],
+                                        "handedness": ["R", "l", None, "R", "L"],
+                                        "species": ["homo sapiens", "mus musculus", "homo sapiens", "homo sapiens", "homo sapiens"]})
+
+
+def same_openminds(first, second):
+    if first is None or second is None:
+        return first is second
+    if getattr(first, "id", None) is not None:
+        return first.id == second.id
+    return first.to_jsonld() == second.to_jsonld()
+
+
+@pytest.mark.parametrize("participant_id", ["sub-01", "sub-02", "sub-03", "sub-04"])
+def test_participants_openminds(participant_id):
+    participant = participants_openminds(participants_table)[participant_id]
+    data_subject = table_filter(
+        participants_table, participant_id, "participant_id")
+
+    assert same_openminds(participant["age"], create_openminds_age(data_subject))
+    assert same_openminds(participant["sex"], sex_openminds(data_subject))
+    assert same_openminds(
+        participant["handedness"], handedness_openminds(data_subject))
+    assert same_openminds(participant["species"], spices_openminds(data_subject))
+
+
+def test_participants_openminds_missing_columns():
+    participants = participants_openminds(
+        pd.DataFrame(data={"participant_id": ["sub-01"]}))
+    assert participants["sub-01"]["age"] is None
+    assert participants["sub-01"]["sex"] is None
+    assert participants["sub-01"]["species"].name == "Homo sapiens"
@@ -0,0 +1,78 @@
+import asyncio
+import gzip
+import os
+import pytest
+import bids2openminds.converter
+from bids2openminds import pipeline
+from bids2openminds.main import probe_files
+from bids2openminds.progress import Progress
+
+test_data_set = "ds003"
+
+
+@pytest.fixture
+def files(tmp_path):
+    header = (348).to_bytes(4, "little") + bytes(344)
+    contents = {"sub-01_T1w.nii": header, "sub-01_bold.nii.gz": gzip.compress(header),
+                "sub-01_events.tsv": b"onset\tduration\n", "empty.txt": b""}
+    paths = []
+    for index in range(5):
+        for name, content in contents.items():
+            path = tmp_path / f"{index}_{name}"
+            path.write_bytes(content * (index + 1))
+            paths.append(str(path))
+    extensions = [".nii.gz" if path.endswith(".nii.gz") else os.path.splitext(path)[1] for path in paths]
+    detect_format = [extension.startswith(".nii") for extension in extensions]
+    compute_digest = [index % 3 != 0 for index in range(len(paths))]
+    return paths, detect_format, extensions, compute_digest
+
+
+@pytest.mark.parametrize("concurrency", [1, 3, 64])
+def test_probe_files(files, concurrency):
+    expected = probe_files(*files)
+    assert pipeline.probe_files(*files, concurrency) == expected
+    assert [file_format for _, file_format in expected].count("application/vnd.nifti.1") == 10
+
+
+def test_probe_files_progress(files):
+    events = []
+    sizes = [os.path.getsize(path) for path in files[0]]
+    progress = Progress(events.append, interval=0)
+    progress.start("hash", files_total=len(sizes), bytes_total=sum(sizes))
+    pipeline.probe_files(*files, 4, sizes=sizes, progress=progress)
+    progress.finish()
+
+    assert events[-1].files_done == len(sizes)
+    assert events[-1].bytes_done == sum(sizes)
+
+
+def test_probe_files_running_loop(files):
+    async def probe():
+        return pipeline.probe_files(*files, 4)
+    assert asyncio.run(probe()) == probe_files(*files)
+
+
+def test_probe_files_errors(files, tmp_path):
+    with pytest.raises(ValueError):
+        pipeline.probe_files(*files, 0)
+    with pytest.raises(FileNotFoundError):
+        pipeline.probe_files([str(tmp_path / "missing.tsv")], [False], [".tsv"], [True], 4)
+
+
+def test_stat_files(files):
+    paths = files[0]
+    assert [file_stat.st_size for file_stat in pipeline.stat_files(paths, 4)] == \
+        [os.stat(path).st_size for path in paths]
+
+
+def test_convert_io_concurrency(tmp_path):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    output_path = str(tmp_path / "openminds.jsonld")
+    pipeline_output_path = str(tmp_path / "openminds_pipeline.jsonld")
+
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=output_path, quiet=True)
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=pipeline_output_path, quiet=True,
+                                     io_concurrency=8)
+
+    with open(output_path, "r") as file, open(pipeline_output_path, "r") as pipeline_file:
+        assert file.read() == pipeline_file.read()
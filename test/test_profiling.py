@@ -0,0 +1,45 @@
+import json
+import os
+import bids2openminds.converter
+from bids2openminds.profiling import Profiler
+
+test_data_set = "ds003"
+
+
+def test_profiler_nested_stages():
+    profiler = Profiler()
+    with profiler.stage("create_file"):
+        with profiler.stage("hash"):
+            profiler.add(files=2, bytes_read=100)
+            profiler.add(bytes_read=50)
+        profiler.add(files=3)
+    profiler.add(files=1)
+
+    profile = profiler.to_dict()
+    [create_file] = profile["stages"]
+    [hash_stage] = create_file["stages"]
+    assert (create_file["name"], create_file["files"]) == ("create_file", 3)
+    assert (hash_stage["files"], hash_stage["bytes_read"]) == (2, 150)
+    assert 0 <= hash_stage["wall_time"] <= create_file["wall_time"] <= profile["wall_time"]
+    assert hash_stage["cpu_time"] >= 0
+
+
+def test_convert_profile(tmp_path):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    profile_path = str(tmp_path / "profile.json")
+    collection = bids2openminds.converter.convert(
+        test_dir, save_output=True, output_path=str(tmp_path / "openminds.jsonld"), quiet=True, profile=profile_path)
+    profile = collection.profile
+    assert "process_peak_rss" in profile
+
+    stages = {stage["name"]: stage for stage in profile["stages"]}
+    assert list(stages) == ["layout", "create_subjects", "create_behavioral_protocol", "create_file",
+                            "create_dataset", "validate", "save"]
+    files = stages["layout"]["files"]
+    assert stages["create_file"]["files"] == files
+    hash_stage = {stage["name"]: stage for stage in stages["create_file"]["stages"]}["hash"]
+    assert hash_stage["files"] == files
+    assert hash_stage["bytes_read"] > 0
+
+    with open(profile_path, "r") as file:
+        assert json.load(file)["stages"] == json.loads(json.dumps(profile["stages"]))
@@ -0,0 +1,59 @@
+import io
+import os
+import bids2openminds.converter
+from bids2openminds.progress import Progress, print_progress
+
+test_data_set = "ds003"
+
+
+def test_progress_events():
+    events = []
+    progress = Progress(events.append, interval=0)
+    progress.start("hash", files_total=4, bytes_total=400)
+    for _ in range(4):
+        progress.advance(files=1, bytes_done=100)
+    progress.finish()
+
+    assert [event.files_done for event in events] == [1, 2, 3, 4, 4]
+    assert [event.finished for event in events] == [False] * 4 + [True]
+    assert events[-1].bytes_done == events[-1].bytes_total == 400
+    assert events[-1].eta == 0
+    assert all(event.eta is not None and event.eta >= 0 for event in events)
+
+
+def test_progress_interval():
+    events = []
+    progress = Progress(events.append, interval=3600)
+    progress.start("scan")
+    for _ in range(1000):
+        progress.advance(files=1, bytes_done=10)
+    progress.finish()
+
+    [event] = events
+    assert (event.phase, event.files_done, event.files_total, event.bytes_done) == ("scan", 1000, None, 10000)
+
+
+def test_print_progress():
+    stream = io.StringIO()
+    progress = Progress(lambda event: print_progress(event, stream), interval=0)
+    progress.start("hash", files_total=2, bytes_total=3 * 1024 * 1024)
+    progress.advance(files=1, bytes_done=1024 * 1024)
+    progress.finish()
+
+    lines = stream.getvalue().split("\r")
+    assert lines[1].startswith("hash: 1/2 files, 1.0 MiB/3.0 MiB, ")
+    assert "ETA" in lines[1]
+    assert lines[2].startswith("hash: 1/2 files, 1.0 MiB/3.0 MiB, ")
+    assert lines[2].endswith("\n")
+
+
+def test_convert_progress(tmp_path):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    events = []
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=str(tmp_path / "openminds.jsonld"),
+                                     quiet=True, progress=events.append)
+
+    finished = {event.phase: event for event in events if event.finished}
+    assert list(finished) == ["scan", "hash"]
+    assert finished["hash"].files_done == finished["hash"].files_total
+    assert finished["hash"].bytes_done == finished["hash"].bytes_total > 0
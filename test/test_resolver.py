@@ -0,0 +1,41 @@
+import pytest
+from bids2openminds import mapping, resolver
+
+# (BIDS suffix, name of a technique expected for it, openMINDS type of the technique)
+example_techniques = [("dwi", "diffusion-weighted imaging", "Technique"),
+                      ("MTRmap", "magnetization transfer ratio image processing", "AnalysisTechnique")]
+
+
+@pytest.mark.parametrize("suffix, technique_name, technique_type", example_techniques)
+def test_techniques(suffix, technique_name, technique_type):
+    techniques = resolver.techniques(suffix)
+    names = [technique.name for technique in techniques]
+    assert technique_name in names
+    technique = techniques[names.index(technique_name)]
+    assert type(technique).__name__ == technique_type
+
+
+def test_techniques_unknown_suffix():
+    assert resolver.techniques("unknownsuffix") == []
+    assert resolver.techniques("bold") == []
+
+
+def test_approaches():
+    assert [approach.name for approach in resolver.approaches("anat")] == [
+        "neuroimaging", "anatomy"]
+    assert resolver.approaches("unknowndatatype") == []
+
+
+def test_unresolved_terms():
+    unresolved = resolver.unresolved_terms()
+    for suffix, names in unresolved["techniques"].items():
+        for name in names:
+            assert name in mapping.MAP_2_TECHNIQUES[suffix]
+    assert unresolved["experimental approaches"] == {}
+
+
+def test_controlled_term_memoized():
+    byte = resolver.controlled_term("UnitOfMeasurement", "byte")
+    assert byte.name == "byte"
+    assert resolver.controlled_term("UnitOfMeasurement", "byte") is byte
+    assert resolver.controlled_term("ContentType", "not a content type") is None
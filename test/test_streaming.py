@@ -0,0 +1,90 @@
+import json
+import os
+import pytest
+import openminds.v3.core as omcore
+from openminds import Collection, IRI
+import bids2openminds.converter
+from bids2openminds.streaming import StreamingCollection
+
+test_data_set = "ds003"
+
+
+def create_nodes(number_files):
+    repository = omcore.FileRepository(
+        iri=IRI("file:///dataset"), name="dataset")
+    bundle = omcore.FileBundle(name="sub-01", is_part_of=repository)
+    files = [omcore.File(iri=IRI(f"file:///dataset/sub-01/file_{index}.tsv"), name=f"file_{index}.tsv",
+                         file_repository=repository, is_part_of=bundle,
+                         hashes=omcore.Hash(algorithm="MD5", digest=f"{index:032x}"))
+             for index in range(number_files)]
+    return repository, bundle, files
+
+
+def read_output(path):
+    if os.path.isdir(path):
+        nodes = []
+        for file_name in os.listdir(path):
+            with open(os.path.join(path, file_name), "r") as file:
+                nodes.append(json.load(file))
+        return sorted(nodes, key=lambda node: node["@id"])
+    with open(path, "r") as file:
+        data = json.load(file)
+    data["@graph"].sort(key=lambda node: node["@id"])
+    return data
+
+
+@pytest.mark.parametrize("individual_files", [False, True])
+def test_streaming_collection(tmp_path, individual_files):
+    collection_path = str(tmp_path / "collection")
+    streaming_path = str(tmp_path / "streaming")
+
+    collection = Collection()
+    repository, bundle, files = create_nodes(5)
+    collection.add(repository, bundle, *files)
+    collection.save(collection_path, individual_files=individual_files)
+
+    streaming_collection = StreamingCollection(
+        streaming_path, individual_files=individual_files)
+    repository, bundle, files = create_nodes(5)
+    streaming_collection.add(repository, bundle, *files)
+    assert len(streaming_collection) == 2
+    assert streaming_collection.streamed["https://openminds.ebrains.eu/core/File"] == 5
+    streaming_collection.save(
+        streaming_path, individual_files=individual_files)
+
+    assert read_output(streaming_path) == read_output(collection_path)
+    assert not os.path.exists(streaming_path + ".part")
+    assert not os.path.exists(streaming_path + ".kept")
+
+
+def test_streaming_collection_validate(tmp_path):
+    collection = StreamingCollection(str(tmp_path / "openminds.jsonld"))
+    collection.add(omcore.File(name="sub-01_T1w.nii"))
+    assert collection.validate(ignore=["required", "value"]) == {}
+    assert "required" in collection.validate()["_:000000"]
+
+
+def test_streaming_collection_other_output(tmp_path):
+    collection = StreamingCollection(str(tmp_path / "openminds.jsonld"))
+    with pytest.raises(ValueError):
+        collection.save(str(tmp_path / "openminds"), individual_files=True)
+
+
+@pytest.mark.parametrize("multiple_files", [False, True])
+def test_streaming_conversion(tmp_path, multiple_files):
+    test_dir = os.path.join("bids-examples", test_data_set)
+    output_path = str(tmp_path / "openminds")
+    streaming_output_path = str(tmp_path / "openminds_streaming")
+
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=output_path,
+                                     multiple_files=multiple_files, quiet=True)
+    bids2openminds.converter.convert(test_dir, save_output=True, output_path=streaming_output_path,
+                                     multiple_files=multiple_files, quiet=True, stream=True)
+
+    assert read_output(streaming_output_path) == read_output(output_path)
+
+
+def test_streaming_requires_output():
+    with pytest.raises(ValueError):
+        bids2openminds.converter.convert(os.path.join(
+            "bids-examples", test_data_set), stream=True)
@@ -0,0 +1,14 @@
+import pandas as pd
+from bids2openminds.main import subject_session_pairs
+
+
+def test_subject_session_pairs():
+    layout_df = pd.DataFrame(data={"subject": ["01", "01", "01", "02", None, "03"],
+                                   "session": ["pre", "pre", "post", "pre", "post", None]})
+    assert subject_session_pairs(layout_df) == {
+        ("01", "pre"), ("01", "post"), ("02", "pre")}
+
+
+def test_subject_session_pairs_no_session():
+    layout_df = pd.DataFrame(data={"subject": ["01", "02"]})
+    assert subject_session_pairs(layout_df) == set()